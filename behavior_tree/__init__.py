@@ -20,7 +20,7 @@ from behavior_tree.nodes.leaves import (
 )
 
 # เพิ่มส่วนนี้
-from behavior_tree.utils.visualization import TreeVisualizer
+from behavior_tree.utils.visualization import TreeVisualizer, install_uvloop
 
 __all__ = [
     'BehaviorNode',
@@ -38,4 +38,5 @@ __all__ = [
     'ConditionNode',
     'BlackboardSetNode',
     'TreeVisualizer',  # เพิ่มตรงนี้ด้วย
+    'install_uvloop',
 ]
\ No newline at end of file
@@ -24,6 +24,7 @@ class NodeEvent(Enum):
     SETUP = auto()         # เมื่อเริ่มต้น node
     SHUTDOWN = auto()      # เมื่อปิด node
     STATUS_CHANGED = auto() # เมื่อสถานะเปลี่ยน
+    CHILDREN_CHANGED = auto() # เมื่อมีการเพิ่มหรือลบ node ลูก
     ERROR = auto()         # เมื่อเกิด error
 
 @dataclass
@@ -149,6 +150,39 @@ class BehaviorNode(ABC):
             except Exception as e:
                 self.logger.error(f"Error in event handler: {e}")
     
+    def _emit_event_nowait(self, event: NodeEvent) -> None:
+        """
+        ส่ง event จาก method ที่ไม่ใช่ async (เช่น reset, add_child)
+        
+        handler ธรรมดาถูกเรียกทันที ส่วน handler ที่เป็น coroutine ถูกสร้าง
+        เป็น task ใน event loop ที่กำลังทำงาน (ถ้าไม่มี loop จะถูกข้าม)
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        for handler in list(self.event_handlers[event]):
+            if asyncio.iscoroutinefunction(handler):
+                if loop is not None:
+                    loop.create_task(self._call_async_handler(handler, event))
+                continue
+            try:
+                handler(self, event)
+            except Exception as e:
+                self.logger.error(f"Error in event handler: {e}")
+    
+    async def _call_async_handler(
+        self,
+        handler: Callable,
+        event: NodeEvent
+    ) -> None:
+        """เรียก coroutine handler ที่ถูกตั้งเป็น task จาก _emit_event_nowait"""
+        try:
+            await handler(self, event)
+        except Exception as e:
+            self.logger.error(f"Error in event handler: {e}")
+    
     def _check_preconditions(self) -> bool:
         """ตรวจสอบ preconditions ทั้งหมด"""
         for condition in self.preconditions:
@@ -185,9 +219,13 @@ class BehaviorNode(ABC):
         if not self._is_setup:
             await self.setup()
         
+        previous_status = self.status
+        
         # เช็ค preconditions
         if not self._check_preconditions():
             self.status = NodeStatus.SKIPPED
+            if previous_status != self.status:
+                await self._emit_event(NodeEvent.STATUS_CHANGED)
             return self.status
         
         # เริ่มจับเวลา
@@ -215,6 +253,9 @@ class BehaviorNode(ABC):
             self.metadata.update_tick_stats(duration, self.status)
             self._current_tick_start = None
             
+            if previous_status != self.status:
+                await self._emit_event(NodeEvent.STATUS_CHANGED)
+            
             # แจ้ง event หลังทำงาน
             await self._emit_event(NodeEvent.EXITING)
         
@@ -232,7 +273,10 @@ class BehaviorNode(ABC):
     
     def reset(self) -> None:
         """รีเซ็ตสถานะของ node"""
+        previous_status = self.status
         self.status = NodeStatus.INVALID
+        if previous_status != self.status:
+            self._emit_event_nowait(NodeEvent.STATUS_CHANGED)
     
     def get_path(self) -> str:
         """
@@ -277,12 +321,14 @@ class ParentNode(BehaviorNode):
         self.children.append(child)
         if self.blackboard:
             child.initialize(self.blackboard)
+        self._emit_event_nowait(NodeEvent.CHILDREN_CHANGED)
     
     def remove_child(self, child: BehaviorNode) -> None:
         """ลบ node ลูก"""
         if child in self.children:
             child.parent = None
             self.children.remove(child)
+            self._emit_event_nowait(NodeEvent.CHILDREN_CHANGED)
     
     async def setup(self) -> None:
         """ตั้งค่าเริ่มต้นของ node และลูกทั้งหมด"""
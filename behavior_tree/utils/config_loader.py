@@ -3,15 +3,59 @@ import yaml
 import json
 import logging
 from pathlib import Path
-import jsonschema
 from dataclasses import dataclass
 from enum import Enum
 import importlib.util
+import os
+import pickle
+import pprint
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import msgspec
+    import msgspec.yaml
+except ImportError:  # msgspec เป็น optional dependency
+    msgspec = None
 
 from ..core.node import NodeStatus
 from ..nodes.composites import ParallelPolicy, MemoryPolicy
 
+def _freeze(value: Any) -> Any:
+    """แปลงค่าให้เป็น hashable เพื่อใช้เป็น key ในการ intern properties"""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    # รวม type ไว้ด้วยเพื่อไม่ให้ 1, 1.0 และ True ถูกมองว่าเป็นค่าเดียวกัน
+    return (type(value), value)
+
+class _ReadOnlyProperties(dict):
+    """
+    dict แบบอ่านอย่างเดียวสำหรับ properties ที่ถูก intern
+    
+    ยังเป็น dict จึงใช้กับ json, ** และ dict(...) ได้ตามปกติ แต่การแก้ไข
+    แบบ in-place จะ raise TypeError แทนที่จะไปกระทบ node อื่นที่ใช้ร่วมกัน
+    """
+    __slots__ = ()
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            "interned properties are read-only, assign a new dict instead"
+        )
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+    
+    def __reduce__(self):
+        # unpickle ผ่าน constructor เพราะ __setitem__ ใช้ไม่ได้
+        return (type(self), (dict(self),))
+
 class ConfigFormat(Enum):
     """รูปแบบไฟล์ configuration ที่รองรับ"""
     YAML = "yaml"
@@ -23,27 +67,80 @@ class NodeConfig:
     """โครงสร้างข้อมูล configuration ของ node"""
     name: str
     type: str
-    properties: Dict[str, Any] = None
-    children: List['NodeConfig'] = None
+    properties: Optional[Dict[str, Any]] = None
+    children: Optional[List['NodeConfig']] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """แปลงเป็น dictionary"""
+        """แปลงเป็น dictionary (properties ถูก copy เป็น dict ใหม่เสมอ)"""
         result = {
             'name': self.name,
             'type': self.type
         }
         if self.properties:
-            result['properties'] = self.properties
+            result['properties'] = dict(self.properties)
         if self.children:
             result['children'] = [
                 child.to_dict() for child in self.children
             ]
         return result
 
+if msgspec is not None:
+    class _NodeConfigStruct(msgspec.Struct):
+        """
+        โครงสร้างสำหรับ decode JSON/YAML ด้วย msgspec เท่านั้น
+        
+        ตรวจสอบโครงสร้างระหว่าง decode ที่ระดับ C แล้วแปลงเป็น NodeConfig
+        ทันที properties และ children ไม่เป็น Optional เพื่อให้ค่า null
+        ในไฟล์ถูกปฏิเสธเหมือน _validate_structure (None ใช้เมื่อไม่มี key)
+        """
+        name: str
+        type: str
+        properties: Dict[str, Any] = None
+        children: List['_NodeConfigStruct'] = None
+
+# map นามสกุลไฟล์ไปยังรูปแบบ configuration
+_SUFFIX_MAP: Dict[str, ConfigFormat] = {
+    '.yml': ConfigFormat.YAML,
+    '.yaml': ConfigFormat.YAML,
+    '.json': ConfigFormat.JSON,
+    '.py': ConfigFormat.PYTHON,
+}
+
+class _NoAliasDumper(yaml.Dumper):
+    """
+    Dumper ที่ไม่สร้าง anchor/alias (&id001, *id001)
+    
+    ค่าที่ถูก intern ใช้ object ร่วมกันระหว่างหลาย node ถ้าปล่อยให้
+    yaml สร้าง alias ไฟล์ที่บันทึกจะผูก node เหล่านั้นเข้าด้วยกัน
+    """
+    
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
 class ConfigValidationError(Exception):
     """ข้อผิดพลาดจากการตรวจสอบ configuration"""
     pass
 
+def _parse_single_file(
+    loader: 'ConfigLoader',
+    file_path: Union[str, Path],
+    format: Optional[ConfigFormat],
+    trusted: bool
+) -> 'NodeConfig':
+    """
+    โหลดไฟล์เดียว (ฟังก์ชันระดับ module เพื่อให้ส่งเข้า process pool ได้)
+    
+    รับ loader ทั้งตัวแทนการสร้าง ConfigLoader ใหม่ เพื่อให้ subclass
+    และค่าที่ส่งให้ constructor ถูกใช้ใน worker ด้วย
+    """
+    return loader.load_file(file_path, format, trusted=trusted)
+
+def _default_worker_count() -> int:
+    """จำนวน CPU ที่ process นี้ใช้ได้จริง"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
 class ConfigLoader:
     """
     คลาสสำหรับโหลดและตรวจสอบ configuration ของ Behavior Tree
@@ -74,11 +171,6 @@ class ConfigLoader:
         
         # เก็บ node types ที่รองรับ
         self._node_types = self._collect_node_types()
-        
-        # สร้าง validator
-        self.validator = jsonschema.validators.validator_for(self.SCHEMA)(
-            self.SCHEMA
-        )
     
     def _collect_node_types(self) -> Dict[str, Type]:
         """รวบรวม node types ทั้งหมดที่รองรับ"""
@@ -99,7 +191,9 @@ class ConfigLoader:
     def load_file(
         self,
         file_path: Union[str, Path],
-        format: Optional[ConfigFormat] = None
+        format: Optional[ConfigFormat] = None,
+        *,
+        trusted: bool = False
     ) -> NodeConfig:
         """
         โหลด configuration จากไฟล์
@@ -107,6 +201,9 @@ class ConfigLoader:
         Args:
             file_path: path ของไฟล์
             format: รูปแบบไฟล์ (ถ้าไม่ระบุจะใช้นามสกุลไฟล์)
+            trusted: ข้ามการตรวจสอบ schema, node type และ enum ทั้งหมด
+                ใช้ได้เฉพาะกับไฟล์ที่เชื่อถือได้และผ่านการตรวจสอบมาแล้ว
+                (เช่นตอนรัน test) ถ้าไฟล์ไม่ถูกต้องจะไม่มี error ที่ชัดเจน
             
         Returns:
             NodeConfig: configuration ที่โหลด
@@ -120,6 +217,16 @@ class ConfigLoader:
             format = self._detect_format(path)
         
         try:
+            if msgspec is not None and format in {
+                ConfigFormat.YAML, ConfigFormat.JSON
+            }:
+                # decode และตรวจสอบโครงสร้างในขั้นตอนเดียวด้วย msgspec
+                decoded = self._decode_with_msgspec(path, format)
+                if trusted:
+                    return self._node_config_from_struct(decoded)
+                self._validate_node_config(decoded)
+                return self._node_config_from_struct(decoded, {})
+            
             if format == ConfigFormat.YAML:
                 with path.open('r', encoding='utf-8') as f:
                     data = yaml.safe_load(f)
@@ -131,6 +238,9 @@ class ConfigLoader:
             else:
                 raise ValueError(f"Unsupported format: {format}")
             
+            if trusted:
+                return self._parse_node_config_unchecked(data)
+            
             # ตรวจสอบและแปลงเป็น NodeConfig
             return self.validate_and_parse(data)
             
@@ -139,17 +249,79 @@ class ConfigLoader:
                 f"Error loading configuration from {path}: {e}"
             )
     
+    def load_many(
+        self,
+        file_paths: List[Union[str, Path]],
+        format: Optional[ConfigFormat] = None,
+        *,
+        trusted: bool = False,
+        max_workers: Optional[int] = None
+    ) -> List[NodeConfig]:
+        """
+        โหลด configuration หลายไฟล์พร้อมกันด้วย process pool
+        
+        Args:
+            file_paths: รายการ path ของไฟล์
+            format: รูปแบบไฟล์ (ถ้าไม่ระบุจะใช้นามสกุลของแต่ละไฟล์)
+            trusted: ข้ามการตรวจสอบ (ดู load_file)
+            max_workers: จำนวน worker สูงสุด (ค่าเริ่มต้นคือจำนวน CPU ที่ใช้ได้)
+            
+        Returns:
+            List[NodeConfig]: configuration ตามลำดับเดียวกับ file_paths
+            
+        Raises:
+            ConfigValidationError: ถ้ามีไฟล์ใดไม่ถูกต้อง
+        """
+        if len(file_paths) <= 1:
+            return [
+                self.load_file(path, format, trusted=trusted)
+                for path in file_paths
+            ]
+        
+        workers = min(max_workers or _default_worker_count(), len(file_paths))
+        
+        # loader ที่ pickle ไม่ได้ (เช่น subclass ที่ประกาศใน function หรือ
+        # custom validator ที่เป็น lambda) ส่งข้าม process ไม่ได้ จึงใช้ thread pool แทน
+        try:
+            pickle.dumps(self)
+            executor_class = ProcessPoolExecutor
+        except Exception:
+            self.logger.debug(
+                "config loader is not picklable, using threads"
+            )
+            executor_class = ThreadPoolExecutor
+        
+        with executor_class(max_workers=workers) as executor:
+            return list(executor.map(
+                _parse_single_file,
+                [self] * len(file_paths),
+                file_paths,
+                [format] * len(file_paths),
+                [trusted] * len(file_paths)
+            ))
+    
+    def _decode_with_msgspec(
+        self,
+        path: Path,
+        format: ConfigFormat
+    ) -> '_NodeConfigStruct':
+        """decode ไฟล์เป็น _NodeConfigStruct ด้วย msgspec"""
+        if format == ConfigFormat.YAML:
+            decode = msgspec.yaml.decode
+        else:
+            decode = msgspec.json.decode
+        
+        try:
+            return decode(path.read_bytes(), type=_NodeConfigStruct)
+        except msgspec.ValidationError as e:
+            raise ConfigValidationError(f"Invalid configuration: {e}")
+    
     def _detect_format(self, path: Path) -> ConfigFormat:
         """ตรวจสอบรูปแบบไฟล์จากนามสกุล"""
-        suffix = path.suffix.lower()
-        if suffix in {'.yml', '.yaml'}:
-            return ConfigFormat.YAML
-        elif suffix == '.json':
-            return ConfigFormat.JSON
-        elif suffix == '.py':
-            return ConfigFormat.PYTHON
-        else:
+        format = _SUFFIX_MAP.get(path.suffix.lower())
+        if format is None:
             raise ValueError(f"Cannot detect format for: {path}")
+        return format
     
     def _load_python_module(self, path: Path) -> Dict[str, Any]:
         """โหลด configuration จาก Python module"""
@@ -190,10 +362,7 @@ class ConfigLoader:
             ConfigValidationError: ถ้า configuration ไม่ถูกต้อง
         """
         # ตรวจสอบโครงสร้างพื้นฐาน
-        try:
-            self.validator.validate(data)
-        except jsonschema.exceptions.ValidationError as e:
-            raise ConfigValidationError(f"Invalid configuration: {e}")
+        self._validate_structure(data)
         
         # ตรวจสอบ node type
         node_type = data['type']
@@ -205,8 +374,96 @@ class ConfigLoader:
         # ตรวจสอบ properties ของ node
         self._validate_node_properties(data)
         
-        # แปลงเป็น NodeConfig
-        return self._parse_node_config(data)
+        # แปลงเป็น NodeConfig (node ที่มี properties เหมือนกันจะใช้ dict ร่วมกัน)
+        props_intern: Dict[frozenset, Dict[str, Any]] = {}
+        return self._parse_node_config(data, props_intern)
+    
+    @staticmethod
+    def _validate_structure(data: Any) -> None:
+        """
+        ตรวจสอบโครงสร้างตาม SCHEMA โดยไม่ผ่าน jsonschema
+        
+        SCHEMA มีขนาดเล็กและอ้างอิงตัวเองผ่าน "$ref": "#" เท่านั้น จึงเขียน
+        เป็น loop ตรงๆ แทนการให้ jsonschema resolve ref ทุก node
+        """
+        stack = [(data, '$')]
+        while stack:
+            node, location = stack.pop()
+            
+            if not isinstance(node, dict):
+                raise ConfigValidationError(
+                    f"Invalid configuration: {location} must be an object"
+                )
+            
+            for key in ('name', 'type'):
+                if key not in node:
+                    raise ConfigValidationError(
+                        f"Invalid configuration: {location} is missing "
+                        f"required property '{key}'"
+                    )
+                if not isinstance(node[key], str):
+                    raise ConfigValidationError(
+                        f"Invalid configuration: {location}.{key} "
+                        f"must be a string"
+                    )
+            
+            if 'properties' in node and not isinstance(node['properties'], dict):
+                raise ConfigValidationError(
+                    f"Invalid configuration: {location}.properties "
+                    f"must be an object"
+                )
+            
+            if 'children' in node:
+                children = node['children']
+                if not isinstance(children, list):
+                    raise ConfigValidationError(
+                        f"Invalid configuration: {location}.children "
+                        f"must be an array"
+                    )
+                stack.extend(
+                    (child, f"{location}.children[{i}]")
+                    for i, child in reversed(list(enumerate(children)))
+                )
+    
+    def _validate_node_config(self, config: '_NodeConfigStruct') -> None:
+        """ตรวจสอบ node type และ properties ของ config ที่ decode ด้วย msgspec แล้ว"""
+        if config.type not in self._node_types:
+            raise ConfigValidationError(
+                f"Unknown node type: {config.type}"
+            )
+        
+        self._validate_node_properties({
+            'type': config.type,
+            'properties': config.properties or {}
+        })
+    
+    def _node_config_from_struct(
+        self,
+        struct: '_NodeConfigStruct',
+        props_intern: Optional[Dict[frozenset, Dict[str, Any]]] = None
+    ) -> NodeConfig:
+        """
+        แปลงผลจาก msgspec เป็น NodeConfig
+        
+        ถ้าส่ง props_intern มาจะ intern properties เหมือน _parse_node_config
+        """
+        children = None
+        if struct.children is not None:
+            children = [
+                self._node_config_from_struct(child, props_intern)
+                for child in struct.children
+            ]
+        
+        properties = struct.properties
+        if props_intern is not None:
+            properties = self._intern_properties(properties, props_intern)
+        
+        return NodeConfig(
+            name=struct.name,
+            type=struct.type,
+            properties=properties,
+            children=children
+        )
     
     def _validate_node_properties(self, data: Dict[str, Any]) -> None:
         """ตรวจสอบ properties ของ node"""
@@ -239,22 +496,71 @@ class ConfigLoader:
                     f"Invalid memory_policy: {properties['memory_policy']}"
                 )
     
-    def _parse_node_config(self, data: Dict[str, Any]) -> NodeConfig:
+    def _parse_node_config(
+        self,
+        data: Dict[str, Any],
+        props_intern: Optional[Dict[frozenset, Dict[str, Any]]] = None
+    ) -> NodeConfig:
         """แปลง dictionary เป็น NodeConfig"""
+        if props_intern is None:
+            props_intern = {}
+        
         children = None
         if 'children' in data:
             children = [
-                self._parse_node_config(child)
+                self._parse_node_config(child, props_intern)
                 for child in data['children']
             ]
         
         return NodeConfig(
             name=data['name'],
             type=data['type'],
-            properties=data.get('properties'),
+            properties=self._intern_properties(
+                data.get('properties'), props_intern
+            ),
             children=children
         )
     
+    def _parse_node_config_unchecked(self, data: Dict[str, Any]) -> NodeConfig:
+        """แปลง dictionary เป็น NodeConfig โดยไม่ตรวจสอบใดๆ (สำหรับ trusted config)"""
+        children = data.get('children')
+        return NodeConfig(
+            name=data['name'],
+            type=data['type'],
+            properties=data.get('properties'),
+            children=[
+                self._parse_node_config_unchecked(child)
+                for child in children
+            ] if children is not None else None
+        )
+    
+    @staticmethod
+    def _intern_properties(
+        properties: Optional[Dict[str, Any]],
+        props_intern: Dict[frozenset, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        คืน properties แบบอ่านอย่างเดียวที่มีเนื้อหาเดียวกันตัวแรกที่เคยเจอ
+        
+        properties ที่ถูก intern ถูกใช้ร่วมกันระหว่างหลาย NodeConfig จึงคืนเป็น
+        _ReadOnlyProperties เพื่อไม่ให้การแก้ไขของ node หนึ่งไปกระทบ node อื่น
+        ถ้าต้องการแก้ให้กำหนด dict ใหม่ เช่น
+        config.properties = {**config.properties, 'key': value}
+        """
+        if properties is None:
+            return None
+        
+        try:
+            key = _freeze(properties)
+        except TypeError:
+            # มีค่าที่ hash ไม่ได้ ไม่ใช้ร่วมกับ node อื่น
+            return _ReadOnlyProperties(properties)
+        
+        interned = props_intern.get(key)
+        if interned is None:
+            interned = props_intern[key] = _ReadOnlyProperties(properties)
+        return interned
+    
     def save_config(
         self,
         config: NodeConfig,
@@ -280,14 +586,20 @@ class ConfigLoader:
         try:
             if format == ConfigFormat.YAML:
                 with path.open('w', encoding='utf-8') as f:
-                    yaml.dump(data, f, default_flow_style=False)
+                    yaml.dump(
+                        data, f,
+                        Dumper=_NoAliasDumper,
+                        default_flow_style=False
+                    )
             elif format == ConfigFormat.JSON:
                 with path.open('w', encoding='utf-8') as f:
                     json.dump(data, f, indent=2)
             elif format == ConfigFormat.PYTHON:
                 with path.open('w', encoding='utf-8') as f:
                     f.write("TREE_CONFIG = ")
-                    f.write(repr(data))
+                    # เขียนแบบ stream ลงไฟล์ ไม่ต้องสร้าง string ทั้งก้อนด้วย repr()
+                    # (ไม่ใช้ json.dump เพราะ true/false/null ไม่ใช่ Python literal)
+                    pprint.pprint(data, stream=f, sort_dicts=False)
             else:
                 raise ValueError(f"Unsupported format: {format}")
                 
@@ -341,21 +653,35 @@ class ConfigMerger:
         override_children: List[NodeConfig]
     ) -> List[NodeConfig]:
         """รวม children nodes"""
-        result = base_children.copy()
+        if not override_children:
+            return list(base_children)
+        
+        # สร้าง map เฉพาะชื่อที่มีอยู่ใน override เท่านั้น
+        override_names = {child.name for child in override_children}
+        base_map = {
+            child.name: i
+            for i, child in enumerate(base_children)
+            if child.name in override_names
+        }
         
-        # สร้าง map ของ children ตามชื่อ
-        base_map = {child.name: i for i, child in enumerate(base_children)}
+        merged: Dict[int, NodeConfig] = {}
+        appended: List[NodeConfig] = []
         
         for override_child in override_children:
             if override_child.name in base_map:
                 # อัพเดต existing child
                 index = base_map[override_child.name]
-                result[index] = self.merge_configs(
-                    result[index],
+                merged[index] = self.merge_configs(
+                    merged.get(index, base_children[index]),
                     override_child
                 )
             else:
                 # เพิ่ม child ใหม่
-                result.append(override_child)
+                appended.append(override_child)
         
-        return result
+        if not merged:
+            return [*base_children, *appended]
+        
+        return [
+            merged.get(i, child) for i, child in enumerate(base_children)
+        ] + appended
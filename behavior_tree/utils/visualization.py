@@ -1,19 +1,156 @@
-from typing import Dict, Any, Optional, List, Set
-import graphviz
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Set, Tuple, Deque
 from datetime import datetime
 import json
 import asyncio
+import io
 import logging
+import os
+import shutil
+import sys
+import time
 from pathlib import Path
 import math
 from enum import Enum
-from dataclasses import dataclass
-import websockets
+from dataclasses import dataclass, fields
+import itertools
 import threading
+import weakref
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from queue import Queue
 
+try:
+    import orjson
+except ImportError:  # orjson เป็น optional dependency
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy เป็น optional dependency
+    np = None
+
 from ..core.node import BehaviorNode, NodeStatus, NodeEvent, ParentNode
 
+if TYPE_CHECKING:
+    # graphviz และ websockets ถูก import เมื่อใช้งานจริงเท่านั้น
+    import graphviz
+    import websockets
+
+_uvloop_installed = False
+
+def install_uvloop() -> bool:
+    """
+    ใช้ uvloop เป็น event loop ของทั้ง process ถ้ามีติดตั้งไว้
+    
+    มีผลกับ loop ที่สร้างหลังจากนี้เท่านั้น จึงต้องเรียกก่อน asyncio.run()
+    คืนค่า True ถ้า uvloop ถูกใช้งาน
+    """
+    global _uvloop_installed
+    if _uvloop_installed:
+        return True
+    if sys.platform == 'win32':
+        return False
+    
+    try:
+        # import เมื่อเรียกใช้เท่านั้น (uvloop เป็น optional dependency)
+        import uvloop
+    except ImportError:
+        return False
+    
+    uvloop.install()
+    _uvloop_installed = True
+    return True
+
+def _encode_default(obj: Any) -> Any:
+    """แปลง object ที่ JSON encoder ไม่รู้จัก"""
+    if isinstance(obj, Enum):
+        return obj.name
+    if isinstance(obj, NodeVisualData):
+        # ใช้เฉพาะ fallback json เท่านั้น orjson แปลง dataclass เองในระดับ C
+        return {name: getattr(obj, name) for name in _NODE_VISUAL_FIELDS}
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _encode(obj: Any) -> bytes:
+    """แปลงเป็น JSON bytes (ใช้ orjson ถ้ามี)"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_encode_default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, default=_encode_default).encode('utf-8')
+
+# ชื่อของแต่ละสถานะ (เลี่ยงการเรียก Enum.name ซ้ำทุก node)
+_STATUS_NAME: Dict[NodeStatus, str] = {status: status.name for status in NodeStatus}
+
+# style classes ท้ายแผนภาพ Mermaid
+_CLASSDEF_FOOTER = (
+    "\nclassDef statusSUCCESS fill:#28a745"
+    "\nclassDef statusFAILURE fill:#dc3545"
+    "\nclassDef statusRUNNING fill:#ffc107"
+    "\nclassDef statusINVALID fill:#6c757d"
+)
+
+# header 1 byte หน้าข้อความที่ส่งทาง WebSocket: 0 = JSON ปกติ, 1 = บีบอัดด้วย zlib
+_FRAME_RAW = b'\x00'
+_FRAME_ZLIB = b'\x01'
+_COMPRESS_THRESHOLD = 1024
+
+def _frame_payload(message: bytes) -> bytes:
+    """
+    เตรียมข้อความสำหรับส่งทาง WebSocket
+    
+    ข้อความขนาดใหญ่จะถูกบีบอัดครั้งเดียวที่นี่ แทนที่จะให้ permessage-deflate
+    บีบอัดซ้ำแยกตาม client
+    """
+    if len(message) > _COMPRESS_THRESHOLD:
+        return _FRAME_ZLIB + zlib.compress(message, 1)
+    return _FRAME_RAW + message
+
+def _build_graph(
+    dot: 'graphviz.Digraph',
+    data: Dict[str, List[Any]],
+    style_tuple: Dict[NodeStatus, Tuple[str, str]],
+    default_style: Tuple[str, str]
+) -> None:
+    """สร้างกราฟจาก snapshot (ดู TreeVisualizer._create_snapshot)"""
+    dot.attr(rankdir='TB')
+    
+    ids = data['ids']
+    parents = data['parents']
+    for i, node_id in enumerate(ids):
+        style_str, color_str = style_tuple.get(
+            NodeStatus[data['statuses'][i]], default_style
+        )
+        
+        dot.node(
+            node_id,
+            f"{data['names'][i]}\n({data['types'][i]})",
+            style=style_str,
+            fillcolor=color_str
+        )
+        
+        if parents[i] >= 0:
+            dot.edge(ids[parents[i]], node_id)
+
+def _render_frame(
+    frame_path: str,
+    graph_data: Dict[str, List[Any]],
+    style_tuple: Dict[NodeStatus, Tuple[str, str]],
+    default_style: Tuple[str, str]
+) -> str:
+    """render เฟรมของ animation เป็น PNG (ฟังก์ชันระดับ module เพื่อส่งเข้า process pool ได้)"""
+    import graphviz
+    
+    dot = graphviz.Digraph()
+    _build_graph(dot, graph_data, style_tuple, default_style)
+    dot.render(frame_path, format='png', cleanup=True)
+    return f"{frame_path}.png"
+
 class VisualizationFormat(Enum):
     """รูปแบบการแสดงผลที่รองรับ"""
     GRAPHVIZ = "graphviz"
@@ -22,19 +159,33 @@ class VisualizationFormat(Enum):
     HTML = "html"
     MERMAID = "mermaid"
 
-@dataclass
+# slots ของ dataclass ต้องใช้ Python 3.10 ขึ้นไป
+_DATACLASS_SLOTS: Dict[str, bool] = (
+    {'slots': True} if sys.version_info >= (3, 10) else {}
+)
+
+@dataclass(**_DATACLASS_SLOTS)
 class NodeVisualData:
-    """ข้อมูลการแสดงผลของ node"""
+    """
+    ข้อมูลการแสดงผลของ node (หนึ่งรายการใน 'changes' ของข้อความ delta)
+    
+    orjson encode dataclass ได้โดยตรงในระดับ C จึงไม่ต้องสร้าง dict
+    ของแต่ละ node ก่อน encode
+    """
     id: str
     name: str
     type: str
-    status: NodeStatus
+    status: str  # ชื่อของ NodeStatus
     depth: int
     parent_id: Optional[str] = None
     children: List[str] = None
     properties: Dict[str, Any] = None
     metadata: Dict[str, Any] = None
 
+_NODE_VISUAL_FIELDS: Tuple[str, ...] = tuple(
+    field.name for field in fields(NodeVisualData)
+)
+
 class TreeVisualizer:
     """
     คลาสหลักสำหรับแสดงผล Behavior Tree
@@ -54,16 +205,38 @@ class TreeVisualizer:
         self.websocket_port = websocket_port
         
         # สำหรับเก็บประวัติการเปลี่ยนแปลง
-        self.history: List[Dict[str, Any]] = []
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
         
         # สำหรับ real-time monitoring
         self.monitoring = False
         self._monitor_task: Optional[asyncio.Task] = None
+        self._snapshot_pool: Optional[ThreadPoolExecutor] = None
+        
+        # ถูก set เมื่อมี node เปลี่ยนสถานะ (ดู _on_status_changed)
+        # สร้างใน start_monitoring เพื่อให้ผูกกับ event loop ที่ใช้ monitor จริง
+        self._dirty: Optional[asyncio.Event] = None
+        self._watched_nodes: Set[BehaviorNode] = set()
+        # ถูก set เมื่อมีการเพิ่มหรือลบ node ระหว่าง monitor
+        self._tree_changed = False
         self._update_queue: Queue = Queue()
         
         # สำหรับ WebSocket
         self._websocket_server = None
-        self._connected_clients: Set[websockets.WebSocketServerProtocol] = set()
+        self._connected_clients: Set['websockets.WebSocketServerProtocol'] = set()
+        
+        # ทุก client ต้องส่งเสร็จภายใน _send_timeout ของแต่ละ broadcast
+        # client ที่ช้ากว่านี้จะถูกตัดออก
+        self._send_timeout = 1.0
+        
+        # id สั้นๆ ที่คงที่ของแต่ละ node ("n0", "n1", ...) ใช้ร่วมกันทุก view
+        self._id_cache: "weakref.WeakKeyDictionary[BehaviorNode, str]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._id_counter = itertools.count()
+        self._id_lock = threading.Lock()
+        
+        # สถานะล่าสุดของแต่ละ node (ตาม id) สำหรับคำนวณ delta ที่ส่งให้ clients
+        self._last_snapshot_by_id: Dict[str, NodeVisualData] = {}
         
         # ตั้งค่าสีและสไตล์
         self.style = {
@@ -75,14 +248,34 @@ class TreeVisualizer:
             NodeStatus.ERROR: {"color": "#dc3545", "style": "filled,bold"}
         }
         
+        # (style, color) ของแต่ละสถานะ สร้างครั้งเดียวจาก self.style
+        self._style_tuple: Dict[NodeStatus, Tuple[str, str]] = {
+            status: (style.get('style', ''), style.get('color', '#ffffff'))
+            for status, style in self.style.items()
+        }
+        self._default_style: Tuple[str, str] = ('', '#ffffff')
+        
         self.logger = logging.getLogger("TreeVisualizer")
     
     async def start_monitoring(self, tree_manager) -> None:
-        """เริ่มการ monitor tree แบบ real-time"""
+        """
+        เริ่มการ monitor tree แบบ real-time
+        
+        snapshot จะถูกสร้างเมื่อมี node เปลี่ยนสถานะเท่านั้น โดยรวม event
+        ที่เกิดขึ้นภายใน update_interval เป็น snapshot เดียว ต้องกำหนด
+        tree_manager.root ก่อนเรียก method นี้
+        """
         if self.monitoring:
             return
             
         self.monitoring = True
+        self._dirty = asyncio.Event()
+        self._tree_changed = False
+        # _watch_tree set _dirty ไว้ด้วย snapshot แรกจึงถูกสร้างทันที
+        self._watch_tree(tree_manager.root)
+        self._snapshot_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="tv-snap"
+        )
         
         if self.enable_websocket:
             await self._start_websocket_server()
@@ -94,6 +287,7 @@ class TreeVisualizer:
     async def stop_monitoring(self) -> None:
         """หยุดการ monitor"""
         self.monitoring = False
+        self._unwatch_tree()
         
         if self._monitor_task:
             self._monitor_task.cancel()
@@ -102,130 +296,380 @@ class TreeVisualizer:
             except asyncio.CancelledError:
                 pass
         
+        if self._snapshot_pool:
+            self._snapshot_pool.shutdown(wait=False)
+            self._snapshot_pool = None
+        
         if self._websocket_server:
             self._websocket_server.close()
             await self._websocket_server.wait_closed()
     
     async def _monitor_loop(self, tree_manager) -> None:
         """loop สำหรับ monitor การเปลี่ยนแปลงของ tree"""
+        loop = asyncio.get_running_loop()
         try:
             while self.monitoring:
+                await self._dirty.wait()
+                
+                # รอให้ event ที่เกิดติดๆ กันรวมเป็นครั้งเดียว
+                await asyncio.sleep(self.update_interval)
+                self._dirty.clear()
+                
+                if self._tree_changed:
+                    # มี node ถูกเพิ่มหรือลบ ลงทะเบียน handler ใหม่ทั้ง tree
+                    self._tree_changed = False
+                    self._unwatch_tree()
+                    self._watch_tree(tree_manager.root)
+                    self._dirty.clear()
+                
                 if tree_manager.root:
-                    # สร้างข้อมูลสถานะปัจจุบัน
-                    visual_data = self._create_visual_data(tree_manager.root)
-                    timestamp = datetime.now().isoformat()
-                    
-                    update = {
-                        'timestamp': timestamp,
-                        'tree_data': visual_data,
-                        'stats': tree_manager.get_stats()
+                    # แปลง enum ใน stats เป็นชื่อเพื่อให้ encode ได้เหมือนกัน
+                    # ทั้ง orjson และ json
+                    stats = {
+                        key: value.name if isinstance(value, Enum) else value
+                        for key, value in tree_manager.get_stats().items()
                     }
                     
-                    # เก็บประวัติ
+                    # snapshot ต้องสร้างใน event loop เพราะ tree ถูก tick และ
+                    # properties/stats ถูกแก้ไขใน loop นี้ ส่วนการคำนวณ delta
+                    # และ encode ทำใน worker thread เพื่อไม่ให้ loop ถูกบล็อก
+                    visual_data = self._create_snapshot(tree_manager.root)
+                    update, message = await loop.run_in_executor(
+                        self._snapshot_pool,
+                        self._diff_and_encode,
+                        visual_data,
+                        stats
+                    )
+                    
+                    # เก็บประวัติ (deque ตัดรายการเก่าที่เกิน max_history ให้เอง)
                     self.history.append(update)
-                    if len(self.history) > self.max_history:
-                        self.history.pop(0)
                     
-                    # ส่งข้อมูลไปยัง WebSocket clients
-                    if self._connected_clients:
-                        message = json.dumps(update)
+                    # ส่งเฉพาะ node ที่เปลี่ยนไปยัง WebSocket clients
+                    if message is not None and self._connected_clients:
                         await self._broadcast_update(message)
                     
                     # เก็บข้อมูลสำหรับการแสดงผลอื่นๆ
                     self._update_queue.put(update)
                 
-                await asyncio.sleep(self.update_interval)
-                
         except asyncio.CancelledError:
             self.logger.info("Monitoring stopped")
         except Exception as e:
             self.logger.error(f"Error in monitor loop: {e}")
     
-    def _create_visual_data(self, node: BehaviorNode, depth: int = 0) -> Dict:
-        """สร้างข้อมูลสำหรับแสดงผล"""
-        data = NodeVisualData(
-            id=str(id(node)),
-            name=node.name,
-            type=node.__class__.__name__,
-            status=node.status,
-            depth=depth,
-            parent_id=str(id(node.parent)) if node.parent else None,
-            children=[],
-            properties=node.properties,
-            metadata={
-                'path': node.get_path(),
-                'stats': getattr(node, 'stats', {})
-            }
-        )
+    def _watch_tree(self, root: Optional[BehaviorNode]) -> None:
+        """
+        ลงทะเบียน handler ของ STATUS_CHANGED กับทุก node ใน tree
         
-        if isinstance(node, ParentNode):
-            for child in node.children:
-                child_data = self._create_visual_data(child, depth + 1)
-                data.children.append(child_data)
+        ลงทะเบียน CHILDREN_CHANGED ด้วย เพื่อให้ node ที่ถูกเพิ่มหลัง
+        start_monitoring ถูก watch ใน snapshot ถัดไป
+        """
+        self._dirty.set()
+        if root is None:
+            return
+        
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.add_event_handler(
+                NodeEvent.STATUS_CHANGED, self._on_status_changed
+            )
+            node.add_event_handler(
+                NodeEvent.CHILDREN_CHANGED, self._on_children_changed
+            )
+            self._watched_nodes.add(node)
+            if isinstance(node, ParentNode):
+                stack.extend(node.children)
+    
+    def _unwatch_tree(self) -> None:
+        """ยกเลิก handler ที่ลงทะเบียนไว้ใน _watch_tree"""
+        for node in self._watched_nodes:
+            node.remove_event_handler(
+                NodeEvent.STATUS_CHANGED, self._on_status_changed
+            )
+            node.remove_event_handler(
+                NodeEvent.CHILDREN_CHANGED, self._on_children_changed
+            )
+        self._watched_nodes.clear()
+    
+    def _on_status_changed(self, node: BehaviorNode, event: NodeEvent) -> None:
+        """แจ้ง monitor loop ว่ามีการเปลี่ยนแปลง"""
+        if self._dirty is not None:
+            self._dirty.set()
+    
+    def _on_children_changed(self, node: BehaviorNode, event: NodeEvent) -> None:
+        """แจ้ง monitor loop ให้ลงทะเบียน handler ใหม่ก่อนสร้าง snapshot"""
+        self._tree_changed = True
+        self._on_status_changed(node, event)
+    
+    def _diff_and_encode(
+        self,
+        visual_data: Dict[str, List[Any]],
+        stats: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        คำนวณ delta และ encode snapshot (ทำงานใน worker thread)
+        
+        visual_data ต้องมาจาก _create_snapshot ที่เรียกใน event loop ซึ่ง copy
+        ข้อมูลที่แก้ไขได้ของ node ไว้แล้ว method นี้จึงไม่แตะ node โดยตรง
+        
+        Returns:
+            Tuple: (update สำหรับเก็บใน history, ข้อความ delta หรือ None
+            ถ้าไม่มี node ใดเปลี่ยน)
+        """
+        timestamp = datetime.now().isoformat()
+        
+        update = {
+            'timestamp': timestamp,
+            'tree_data': visual_data,
+            'stats': stats
+        }
+        
+        changes, removed = self._diff_snapshot(visual_data)
+        message = None
+        if changes or removed:
+            message = _encode({
+                'type': 'delta',
+                'timestamp': timestamp,
+                'changes': changes,
+                'removed': removed,
+                'stats': stats
+            })
+        
+        return update, message
+    
+    def _node_id(self, node: BehaviorNode) -> str:
+        """id ของ node สำหรับใช้ใน graph และ snapshot"""
+        node_id = self._id_cache.get(node)
+        if node_id is None:
+            # view ต่างๆ อาจถูกเรียกจากหลาย thread จึงต้องล็อกตอนจอง id ใหม่
+            with self._id_lock:
+                node_id = self._id_cache.get(node)
+                if node_id is None:
+                    node_id = f"n{next(self._id_counter)}"
+                    self._id_cache[node] = node_id
+        return node_id
+    
+    def _create_snapshot(self, root: BehaviorNode) -> Dict[str, List[Any]]:
+        """
+        สร้าง snapshot ของ tree แบบ struct-of-arrays
+        
+        ข้อมูลของ node ลำดับที่ i (ตามลำดับ pre-order) อยู่ที่ index i ของทุก
+        list ส่วน parents เก็บ index ของ node แม่ (-1 สำหรับ root)
+        
+        properties และ stats ถูก copy ไว้ เพราะเป็น dict ที่ node แก้ไขต่อ
+        ระหว่าง tick snapshot จึงส่งต่อให้ thread อื่นได้อย่างปลอดภัย
+        """
+        ids: List[str] = []
+        names: List[str] = []
+        types: List[str] = []
+        statuses: List[str] = []
+        parents: List[int] = []
+        depths: List[int] = []
+        paths: List[str] = []
+        properties: List[Dict[str, Any]] = []
+        stats: List[Dict[str, Any]] = []
+        
+        stack = [(root, -1, 0)]
+        while stack:
+            node, parent_index, depth = stack.pop()
+            index = len(ids)
+            
+            ids.append(self._node_id(node))
+            names.append(node.name)
+            types.append(type(node).__name__)
+            statuses.append(_STATUS_NAME[node.status])
+            parents.append(parent_index)
+            depths.append(depth)
+            # ต่อ path จาก node แม่แทนการเรียก get_path() ซึ่งไล่ขึ้นไปถึง root
+            paths.append(
+                f"{paths[parent_index]}/{node.name}"
+                if parent_index >= 0 else node.get_path()
+            )
+            properties.append(dict(node.properties))
+            stats.append(dict(getattr(node, 'stats', {})))
+            
+            if isinstance(node, ParentNode):
+                stack.extend(
+                    (child, index, depth + 1)
+                    for child in reversed(node.children)
+                )
+        
+        return {
+            'ids': ids,
+            'names': names,
+            'types': types,
+            'statuses': statuses,
+            'parents': parents,
+            'depths': depths,
+            'paths': paths,
+            'properties': properties,
+            'stats': stats
+        }
+    
+    def _diff_snapshot(
+        self,
+        tree_data: Dict[str, List[Any]]
+    ) -> Tuple[List[NodeVisualData], List[str]]:
+        """
+        เปรียบเทียบ snapshot กับครั้งก่อนหน้า
+        
+        Returns:
+            Tuple: (ข้อมูล node ที่เพิ่มหรือเปลี่ยน, id ของ node ที่ถูกลบ)
+        """
+        ids = tree_data['ids']
+        parents = tree_data['parents']
+        previous = self._last_snapshot_by_id
+        current: Dict[str, NodeVisualData] = {}
+        changes: List[NodeVisualData] = []
+        
+        # id ของลูกแต่ละ node (node ลูกอยู่หลัง node แม่เสมอตามลำดับ pre-order)
+        children: List[List[str]] = [[] for _ in ids]
+        for i, parent_index in enumerate(parents):
+            if parent_index >= 0:
+                children[parent_index].append(ids[i])
+        
+        for i, node_id in enumerate(ids):
+            record = NodeVisualData(
+                id=node_id,
+                name=tree_data['names'][i],
+                type=tree_data['types'][i],
+                status=tree_data['statuses'][i],
+                depth=tree_data['depths'][i],
+                parent_id=ids[parents[i]] if parents[i] >= 0 else None,
+                children=children[i],
+                properties=tree_data['properties'][i],
+                metadata={
+                    'path': tree_data['paths'][i],
+                    'stats': tree_data['stats'][i]
+                }
+            )
+            current[node_id] = record
+            if previous.get(node_id) != record:
+                changes.append(record)
         
-        return data.__dict__
+        removed = [node_id for node_id in previous if node_id not in current]
+        self._last_snapshot_by_id = current
+        return changes, removed
     
     async def _start_websocket_server(self) -> None:
         """เริ่ม WebSocket server"""
+        import websockets
+        
         async def handler(websocket, path):
             self._connected_clients.add(websocket)
             try:
+                # ส่ง snapshot เต็มครั้งแรก หลังจากนี้จะได้รับเฉพาะ delta
+                if self.history:
+                    await websocket.send(_frame_payload(
+                        _encode({'type': 'snapshot', **self.history[-1]})
+                    ))
+
                 async for message in websocket:
                     # รับคำสั่งจาก client ถ้าจำเป็น
                     pass
             except websockets.exceptions.ConnectionClosed:
                 pass
             finally:
-                self._connected_clients.remove(websocket)
+                self._connected_clients.discard(websocket)
         
+        # ปิด permessage-deflate เพราะ _frame_payload บีบอัดข้อความไว้แล้ว
         self._websocket_server = await websockets.serve(
-            handler, 'localhost', self.websocket_port
+            handler, 'localhost', self.websocket_port, compression=None
         )
     
-    async def _broadcast_update(self, message: str) -> None:
+    async def _broadcast_update(self, message: bytes) -> None:
         """ส่งข้อมูลไปยัง WebSocket clients ทั้งหมด"""
         if not self._connected_clients:
             return
         
-        await asyncio.gather(*[
-            client.send(message)
-            for client in self._connected_clients
-        ])
+        # frame ครั้งเดียวแล้วส่ง bytes ชุดเดียวกันให้ทุก client
+        send_task = asyncio.ensure_future(
+            self._send_to_clients(
+                _frame_payload(message), list(self._connected_clients)
+            )
+        )
+        try:
+            # ถ้า monitor loop ถูก cancel ระหว่างส่ง ให้ส่งต่อจนครบทุก client
+            await asyncio.shield(send_task)
+        except asyncio.CancelledError:
+            send_task.add_done_callback(self._drop_failed_clients)
+            raise
+        self._drop_failed_clients(send_task)
+    
+    async def _send_to_clients(
+        self,
+        message: bytes,
+        clients: List[Any]
+    ) -> List[Any]:
+        """
+        ส่ง message ให้ clients และคืนรายการ client ที่ส่งไม่สำเร็จ
+        
+        ส่งพร้อมกันทุก client ภายใต้ deadline เดียว client ที่ค้างจึงไม่ทำให้
+        client ถัดไปต้องรอ และ broadcast หนึ่งครั้งใช้เวลาไม่เกิน _send_timeout
+        """
+        if not clients:
+            return []
+        
+        sends = {
+            asyncio.ensure_future(client.send(message)): client
+            for client in clients
+        }
+        done, pending = await asyncio.wait(sends, timeout=self._send_timeout)
+        
+        failed = []
+        for task in pending:
+            task.cancel()
+            failed.append(sends[task])
+        for task in done:
+            if task.cancelled() or task.exception() is not None:
+                failed.append(sends[task])
+        return failed
+    
+    def _drop_failed_clients(self, send_task: asyncio.Future) -> None:
+        """ตัด client ที่ส่งไม่สำเร็จ (หลุดหรือช้าเกินไป) ออก"""
+        if send_task.cancelled():
+            return
+        for client in send_task.result():
+            self._connected_clients.discard(client)
     
     def create_graphviz(
         self,
         root: BehaviorNode,
         filename: Optional[str] = None,
         format: str = "png"
-    ) -> graphviz.Digraph:
+    ) -> 'graphviz.Digraph':
         """สร้างแผนภาพด้วย Graphviz"""
+        import graphviz
+        
         dot = graphviz.Digraph(comment='Behavior Tree')
         dot.attr(rankdir='TB')
         
         def add_node(node: BehaviorNode):
-            node_id = str(id(node))
-            style = self.style.get(node.status, {})
+            node_id = self._node_id(node)
+            style_str, color_str = self._style_tuple.get(
+                node.status, self._default_style
+            )
             
             # สร้างข้อความแสดงข้อมูล
-            label = f"{node.name}\n({node.__class__.__name__})"
-            if hasattr(node, 'stats'):
-                stats = node.stats
+            label = "{}\n({})".format(node.name, type(node).__name__)
+            stats = getattr(node, 'stats', None)
+            if stats:
                 if 'total_runs' in stats:
-                    label += f"\nRuns: {stats['total_runs']}"
+                    label += "\nRuns: {}".format(stats['total_runs'])
                 if 'success_count' in stats:
-                    label += f"\nSuccess: {stats['success_count']}"
+                    label += "\nSuccess: {}".format(stats['success_count'])
             
             dot.node(
                 node_id,
                 label,
-                style=style.get('style', ''),
-                fillcolor=style.get('color', '#ffffff'),
+                style=style_str,
+                fillcolor=color_str,
                 fontsize='10'
             )
             
             if isinstance(node, ParentNode):
                 for child in node.children:
-                    child_id = str(id(child))
+                    child_id = self._node_id(child)
                     add_node(child)
                     dot.edge(node_id, child_id)
         
@@ -238,53 +682,94 @@ class TreeVisualizer:
     
     def create_ascii(self, root: BehaviorNode) -> str:
         """สร้างแผนภาพแบบ ASCII"""
-        output = []
+        return self.fill_ascii_template(*self.compile_ascii_template(root))
+    
+    def compile_ascii_template(
+        self,
+        root: BehaviorNode
+    ) -> Tuple[List[str], List[Tuple[int, BehaviorNode]]]:
+        """
+        สร้าง template ของแผนภาพ ASCII ครั้งเดียว
+        
+        คืนค่า (ส่วนของข้อความ, ตำแหน่งช่องสถานะ) โดยแต่ละช่องคือ (index, node)
+        ใช้คู่กับ fill_ascii_template เมื่อโครงสร้าง tree ไม่เปลี่ยนแล้ว
+        """
+        parts: List[str] = []
+        slots: List[Tuple[int, BehaviorNode]] = []
+        stack = [(root, "", True)]
         
-        def add_node(node: BehaviorNode, prefix: str = "", is_last: bool = True):
+        while stack:
+            node, prefix, is_last = stack.pop()
+            line_start = "\n" if node is not root else ""
+            
             # สร้างเส้นเชื่อม
             connector = "└── " if is_last else "├── "
-            output.append(f"{prefix}{connector}{node.name} ({node.status.name})")
+            parts.append(f"{line_start}{prefix}{connector}{node.name} (")
+            slots.append((len(parts), node))
+            parts.append("")
+            parts.append(")")
             
-            if isinstance(node, ParentNode):
-                for i, child in enumerate(node.children):
-                    new_prefix = prefix + ("    " if is_last else "│   ")
-                    add_node(child, new_prefix, i == len(node.children) - 1)
+            if isinstance(node, ParentNode) and node.children:
+                children = node.children
+                new_prefix = prefix + ("    " if is_last else "│   ")
+                last = len(children) - 1
+                # push ย้อนหลังเพื่อให้ลูกตัวแรกถูก pop ก่อน
+                for i in range(last, -1, -1):
+                    stack.append((children[i], new_prefix, i == last))
         
-        add_node(root)
-        return "\n".join(output)
+        return parts, slots
+    
+    @staticmethod
+    def fill_ascii_template(
+        parts: List[str],
+        slots: List[Tuple[int, BehaviorNode]]
+    ) -> str:
+        """เติมสถานะปัจจุบันของแต่ละ node ลงใน template แล้วคืนเป็นข้อความ"""
+        for index, node in slots:
+            parts[index] = _STATUS_NAME[node.status]
+        return "".join(parts)
     
     def create_mermaid(self, root: BehaviorNode) -> str:
         """สร้างแผนภาพแบบ Mermaid"""
-        output = ["graph TD"]
+        buf = io.StringIO()
+        buf.write("graph TD")
         
-        def add_node(node: BehaviorNode):
-            node_id = str(id(node))
-            style = self.style.get(node.status, {})
+        # stack เก็บทั้ง node และบรรทัด edge ที่ต้องเขียนหลัง subtree ของลูก
+        stack: List[Any] = [root]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                buf.write(item)
+                continue
+            
+            node_id = self._node_id(item)
+            status_name = _STATUS_NAME[item.status]
             
             # กำหนดสไตล์ใน Mermaid
-            output.append(
-                f"{node_id}[{node.name}<br>({node.status.name})]"
-                f":::status{node.status.name}"
+            buf.write(
+                f"\n{node_id}[{item.name}<br>({status_name})]"
+                f":::status{status_name}"
             )
             
-            if isinstance(node, ParentNode):
-                for child in node.children:
-                    child_id = str(id(child))
-                    add_node(child)
-                    output.append(f"{node_id} --> {child_id}")
-        
-        add_node(root)
+            if isinstance(item, ParentNode):
+                for child in reversed(item.children):
+                    stack.append(f"\n{node_id} --> {self._node_id(child)}")
+                    stack.append(child)
         
         # เพิ่ม style classes
-        output.append("classDef statusSUCCESS fill:#28a745")
-        output.append("classDef statusFAILURE fill:#dc3545")
-        output.append("classDef statusRUNNING fill:#ffc107")
-        output.append("classDef statusINVALID fill:#6c757d")
+        buf.write(_CLASSDEF_FOOTER)
         
-        return "\n".join(output)
+        return buf.getvalue()
     
     def create_html(self, root: BehaviorNode) -> str:
         """สร้าง HTML สำหรับแสดงผลแบบ interactive"""
+        nodes_data, edges_data = self._build_vis_data(root)
+        # สีของแต่ละสถานะสำหรับ update ฝั่ง browser (ตรงกับ _build_vis_data)
+        status_colors = {
+            _STATUS_NAME[status]: color
+            for status, (_, color) in self._style_tuple.items()
+        }
+        
         html = f"""
         <!DOCTYPE html>
         <html>
@@ -309,8 +794,8 @@ class TreeVisualizer:
             <div id="node-info" class="node-info"></div>
             
             <script>
-                const nodes = new vis.DataSet({json.dumps(self._create_nodes_data(root))});
-                const edges = new vis.DataSet({json.dumps(self._create_edges_data(root))});
+                const nodes = new vis.DataSet({_encode(nodes_data).decode('utf-8')});
+                const edges = new vis.DataSet({_encode(edges_data).decode('utf-8')});
                 
                 const container = document.getElementById('tree-container');
                 const data = {{ nodes, edges }};
@@ -344,15 +829,69 @@ class TreeVisualizer:
                 
                 // WebSocket connection for real-time updates
                 const ws = new WebSocket('ws://localhost:{self.websocket_port}');
-                ws.onmessage = function(event) {{
-                    const update = JSON.parse(event.data);
-                    // Update nodes and edges with new data
-                    updateVisualization(update.tree_data);
+                ws.binaryType = 'arraybuffer';
+                ws.onmessage = async function(event) {{
+                    // byte แรกบอกว่าข้อความถูกบีบอัดด้วย zlib หรือไม่
+                    const frame = new Uint8Array(event.data);
+                    let body = new Blob([frame.subarray(1)]);
+                    if (frame[0] === 1) {{
+                        body = await new Response(
+                            body.stream().pipeThrough(new DecompressionStream('deflate'))
+                        ).blob();
+                    }}
+                    const update = JSON.parse(await body.text());
+                    if (update.type === 'snapshot') {{
+                        // Update nodes and edges with new data
+                        updateVisualization(update.tree_data);
+                    }} else if (update.type === 'delta') {{
+                        applyChanges(update.changes);
+                        nodes.remove(update.removed);
+                        edges.remove(update.removed);
+                    }}
                 }};
                 
+                const statusColors = {_encode(status_colors).decode('utf-8')};
+                const defaultColor = '{self._default_style[1]}';
+                
+                // Same node/edge layout as TreeVisualizer._build_vis_data:
+                // each node has one edge from its parent, keyed by the node id
+                function applyChanges(changes) {{
+                    nodes.update(changes.map(change => ({{
+                        id: change.id,
+                        label: `${{change.name}}\\n(${{change.type}})`,
+                        status: change.status,
+                        type: change.type,
+                        color: statusColors[change.status] || defaultColor,
+                        metadata: change.metadata
+                    }})));
+                    const moved = changes.filter(change => change.parent_id !== null);
+                    edges.update(moved.map(change => ({{
+                        id: change.id,
+                        from: change.parent_id,
+                        to: change.id
+                    }})));
+                    edges.remove(
+                        changes.filter(change => change.parent_id === null)
+                               .map(change => change.id)
+                    );
+                }}
+                
                 function updateVisualization(treeData) {{
-                    // Update nodes and edges based on new data
-                    // ...
+                    const changes = treeData.ids.map((id, i) => ({{
+                        id: id,
+                        name: treeData.names[i],
+                        type: treeData.types[i],
+                        status: treeData.statuses[i],
+                        parent_id: treeData.parents[i] >= 0
+                            ? treeData.ids[treeData.parents[i]] : null,
+                        metadata: {{
+                            path: treeData.paths[i],
+                            stats: treeData.stats[i]
+                        }}
+                    }}));
+                    nodes.clear();
+                    edges.clear();
+                    applyChanges(changes);
                 }}
             </script>
         </body>
@@ -360,48 +899,54 @@ class TreeVisualizer:
         """
         return html
     
-    def _create_nodes_data(self, root: BehaviorNode) -> List[Dict]:
-        """สร้างข้อมูล nodes สำหรับ vis.js"""
+    def _build_vis_data(
+        self,
+        root: BehaviorNode
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """สร้างข้อมูล nodes และ edges สำหรับ vis.js ใน traversal เดียว"""
         nodes = []
+        edges = []
         
-        def add_node(node: BehaviorNode):
-            style = self.style.get(node.status, {})
+        stack = [(root, None, None)]
+        while stack:
+            node, parent_id, parent_path = stack.pop()
+            node_id = self._node_id(node)
+            type_name = type(node).__name__
+            path = (
+                f"{parent_path}/{node.name}"
+                if parent_path is not None else node.get_path()
+            )
+            
             nodes.append({
-                'id': str(id(node)),
-                'label': f"{node.name}\n({node.__class__.__name__})",
-                'status': node.status.name,
-                'type': node.__class__.__name__,
-                'color': style.get('color', '#ffffff'),
+                'id': node_id,
+                'label': f"{node.name}\n({type_name})",
+                'status': _STATUS_NAME[node.status],
+                'type': type_name,
+                'color': self._style_tuple.get(
+                    node.status, self._default_style
+                )[1],
                 'metadata': {
-                    'path': node.get_path(),
+                    'path': path,
                     'stats': getattr(node, 'stats', {})
                 }
             })
             
+            if parent_id is not None:
+                # node มี edge จาก node แม่ได้เส้นเดียว จึงใช้ id ของ node
+                # เป็น id ของ edge เพื่อให้ delta ใน create_html แทนที่ได้
+                edges.append({
+                    'id': node_id,
+                    'from': parent_id,
+                    'to': node_id
+                })
+            
             if isinstance(node, ParentNode):
-                for child in node.children:
-                    add_node(child)
-        
-        add_node(root)
-        return nodes
-    
-    def _create_edges_data(self, root: BehaviorNode) -> List[Dict]:
-        """สร้างข้อมูล edges สำหรับ vis.js"""
-        edges = []
-        
-        def add_edges(node: BehaviorNode):
-            if isinstance(node, ParentNode):
-                node_id = str(id(node))
-                for child in node.children:
-                    child_id = str(id(child))
-                    edges.append({
-                        'from': node_id,
-                        'to': child_id
-                    })
-                    add_edges(child)
+                stack.extend(
+                    (child, node_id, path)
+                    for child in reversed(node.children)
+                )
         
-        add_edges(root)
-        return edges
+        return nodes, edges
     
     def export_svg(self, root: BehaviorNode) -> str:
         """ส่งออกเป็น SVG string"""
@@ -415,37 +960,47 @@ class TreeVisualizer:
         duration: int = 1000
     ) -> None:
         """สร้างภาพเคลื่อนไหวจากประวัติการเปลี่ยนแปลง"""
+        temp_dir = None
         try:
             import imageio
+            import imageio.v3
             import tempfile
-            from PIL import Image
             
-            frames = []
+            if format.lower() != 'gif':
+                raise ValueError(f"Unsupported animation format: {format}")
+            
             temp_dir = Path(tempfile.mkdtemp())
             
-            for i, snapshot in enumerate(self.history):
-                # สร้างภาพแต่ละเฟรม
-                tree_data = snapshot['tree_data']
-                dot = graphviz.Digraph()
-                self._build_graph_from_data(dot, tree_data)
-                
-                temp_file = temp_dir / f"frame_{i:04d}.png"
-                dot.render(str(temp_file), format='png', cleanup=True)
-                
-                # อ่านภาพและเพิ่มลงในเฟรม
-                frame = Image.open(f"{temp_file}.png")
-                frames.append(frame)
+            # render แต่ละเฟรมพร้อมกัน (graphviz เรียก dot แยก process
+            # ต่อเฟรมอยู่แล้ว) ส่งไปเฉพาะข้อมูลที่ใช้วาดกราฟ
+            graph_keys = ('ids', 'names', 'types', 'statuses', 'parents')
+            frame_paths = [
+                str(temp_dir / f"frame_{i:04d}.png")
+                for i in range(len(self.history))
+            ]
+            graph_data = [
+                {key: snapshot['tree_data'][key] for key in graph_keys}
+                for snapshot in self.history
+            ]
+            try:
+                png_paths = self._render_frames(frame_paths, graph_data)
+            except ImportError:
+                raise
+            except Exception as e:
+                # เช่น graphviz.ExecutableNotFound ที่ส่งกลับมาจาก worker
+                self.logger.error(f"Error rendering animation frames: {e}")
+                return
             
-            # บันทึกเป็น GIF
-            if format.lower() == 'gif':
-                imageio.mimsave(
-                    filename,
-                    frames,
-                    duration=duration/1000,
-                    loop=0
-                )
-            else:
-                raise ValueError(f"Unsupported animation format: {format}")
+            # เขียน GIF ทีละเฟรม ในหน่วยความจำมีภาพที่ decode แล้วแค่เฟรมเดียว
+            with imageio.get_writer(
+                filename,
+                mode='I',
+                duration=duration/1000,
+                loop=0
+            ) as writer:
+                for png_path in png_paths:
+                    writer.append_data(imageio.v3.imread(png_path))
+                    os.remove(png_path)
             
         except ImportError as e:
             self.logger.error(
@@ -453,35 +1008,42 @@ class TreeVisualizer:
             )
         finally:
             # ลบไฟล์ชั่วคราว
-            import shutil
-            shutil.rmtree(temp_dir)
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir)
     
-    def _build_graph_from_data(
+    def _render_frames(
         self,
-        dot: graphviz.Digraph,
-        data: Dict
-    ) -> None:
-        """สร้างกราฟจากข้อมูล node"""
-        dot.attr(rankdir='TB')
+        frame_paths: List[str],
+        graph_data: List[Dict[str, List[Any]]]
+    ) -> List[str]:
+        """
+        render เฟรมทั้งหมดด้วย process pool
         
-        def add_node_from_data(node_data: Dict):
-            style = self.style.get(
-                NodeStatus[node_data['status']], {}
-            )
-            
-            dot.node(
-                node_data['id'],
-                f"{node_data['name']}\n({node_data['type']})",
-                style=style.get('style', ''),
-                fillcolor=style.get('color', '#ffffff')
+        ถ้า pool ใช้งานไม่ได้ (เช่นสร้าง process ไม่ได้ หรือ worker ตาย)
+        จะ render ทีละเฟรมใน process นี้แทน
+        """
+        args = (
+            frame_paths,
+            graph_data,
+            [self._style_tuple] * len(frame_paths),
+            [self._default_style] * len(frame_paths)
+        )
+        try:
+            with ProcessPoolExecutor() as executor:
+                return list(executor.map(_render_frame, *args))
+        except (BrokenProcessPool, OSError) as e:
+            self.logger.warning(
+                f"Process pool unavailable ({e}), rendering frames serially"
             )
-            
-            if node_data.get('children'):
-                for child in node_data['children']:
-                    add_node_from_data(child)
-                    dot.edge(node_data['id'], child['id'])
-        
-        add_node_from_data(data)
+            return list(map(_render_frame, *args))
+    
+    def _build_graph_from_data(
+        self,
+        dot: 'graphviz.Digraph',
+        data: Dict[str, List[Any]]
+    ) -> None:
+        """สร้างกราฟจาก snapshot (ดู _create_snapshot)"""
+        _build_graph(dot, data, self._style_tuple, self._default_style)
     
     def create_sequence_diagram(self, root: BehaviorNode) -> str:
         """สร้าง sequence diagram ในรูปแบบ Mermaid"""
@@ -552,7 +1114,7 @@ class TreeVisualizer:
                             # Handle client messages if needed
                             pass
                 finally:
-                    self._connected_clients.remove(ws)
+                    self._connected_clients.discard(ws)
                 
                 return ws
             
@@ -584,48 +1146,47 @@ class TreeVisualizer:
         if not self.history:
             return {}
         
-        total_nodes = 0
-        status_counts = {status: 0 for status in NodeStatus}
-        execution_times = []
+        # snapshot เก็บแบบ struct-of-arrays อยู่แล้ว จึงนับจำนวน node ได้โดยไม่ต้อง traverse
+        total_nodes = sum(len(snapshot['tree_data']['ids']) for snapshot in self.history)
+        status_counts: Counter = Counter()
+        
+        if np is not None:
+            execution_times = np.empty(total_nodes, dtype=np.float64)
+        else:
+            execution_times = [0.0] * total_nodes
+        count = 0
         
         for snapshot in self.history:
             tree_data = snapshot['tree_data']
-            stats = snapshot['stats']
+            status_counts.update(tree_data['statuses'])
             
-            def process_node(node_data: Dict):
-                nonlocal total_nodes
-                total_nodes += 1
-                status = NodeStatus[node_data['status']]
-                status_counts[status] += 1
-                
-                if node_data.get('metadata', {}).get('stats'):
-                    node_stats = node_data['metadata']['stats']
-                    if 'average_duration' in node_stats:
-                        execution_times.append(
-                            node_stats['average_duration']
-                        )
-                
-                if node_data.get('children'):
-                    for child in node_data['children']:
-                        process_node(child)
-            
-            process_node(tree_data)
+            for node_stats in tree_data['stats']:
+                if node_stats and 'average_duration' in node_stats:
+                    execution_times[count] = node_stats['average_duration']
+                    count += 1
+        
+        execution_times = execution_times[:count]
+        if count == 0:
+            average_time = max_time = min_time = 0
+        elif np is not None:
+            average_time = float(execution_times.mean())
+            max_time = float(execution_times.max())
+            min_time = float(execution_times.min())
+        else:
+            average_time = sum(execution_times) / count
+            max_time = max(execution_times)
+            min_time = min(execution_times)
         
         return {
             'total_snapshots': len(self.history),
             'total_nodes': total_nodes,
             'status_distribution': {
-                status.name: count
-                for status, count in status_counts.items()
+                status.name: status_counts[status.name]
+                for status in NodeStatus
             },
-            'average_execution_time': (
-                sum(execution_times) / len(execution_times)
-                if execution_times else 0
-            ),
-            'max_execution_time': max(execution_times)
-                if execution_times else 0,
-            'min_execution_time': min(execution_times)
-                if execution_times else 0
+            'average_execution_time': average_time,
+            'max_execution_time': max_time,
+            'min_execution_time': min_time
         }
 
 class ConsoleVisualizer:
@@ -639,18 +1200,27 @@ class ConsoleVisualizer:
         """เริ่มแสดงผลแบบ real-time"""
         def update_loop():
             try:
-                import os
+                # ขนาด terminal อ่านครั้งเดียว บรรทัดที่เกินความสูงจะไม่ถูกแสดง
+                # เพราะถ้า terminal scroll การย้าย cursor ไปยังแถวจะผิดตำแหน่ง
+                max_rows = shutil.get_terminal_size().lines
+                previous_lines: Optional[List[str]] = None
+                
                 while not self._stop_event.is_set():
-                    # Clear screen
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    
                     # แสดงสถานะปัจจุบัน
+                    lines: List[str] = []
                     if tree_manager.root:
-                        print(self._create_tree_view(tree_manager.root))
-                        print("\nStats:")
+                        lines.extend(
+                            self._create_tree_view(tree_manager.root).split("\n")
+                        )
+                        lines.append("")
+                        lines.append("Stats:")
                         stats = tree_manager.get_stats()
                         for key, value in stats.items():
-                            print(f"{key}: {value}")
+                            lines.append(f"{key}: {value}")
+                    
+                    lines = lines[:max_rows - 1]
+                    self._redraw(previous_lines, lines)
+                    previous_lines = lines
                     
                     time.sleep(self.refresh_rate)
             except KeyboardInterrupt:
@@ -658,6 +1228,32 @@ class ConsoleVisualizer:
         
         threading.Thread(target=update_loop, daemon=True).start()
     
+    def _redraw(
+        self,
+        previous_lines: Optional[List[str]],
+        lines: List[str]
+    ) -> None:
+        """เขียนเฉพาะบรรทัดที่เปลี่ยนจากเฟรมก่อนด้วย ANSI cursor addressing"""
+        out = []
+        
+        if previous_lines is None:
+            # เฟรมแรก: ล้างหน้าจอแล้วเขียนทั้งหมด
+            out.append("\x1b[H\x1b[J")
+            out.append("\n".join(lines))
+        else:
+            for row, line in enumerate(lines):
+                if row >= len(previous_lines) or previous_lines[row] != line:
+                    # ย้าย cursor ไปแถวนั้น เขียนทับ แล้วลบส่วนที่เหลือของบรรทัด
+                    out.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+            
+            if len(lines) < len(previous_lines):
+                # เฟรมใหม่สั้นกว่า ลบบรรทัดที่เหลือด้านล่าง
+                out.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+        
+        if out:
+            sys.stdout.write("".join(out))
+            sys.stdout.flush()
+    
     def stop(self) -> None:
         """หยุดแสดงผล"""
         self._stop_event.set()
@@ -679,7 +1275,7 @@ class ConsoleVisualizer:
         # สร้างบรรทัดสำหรับ node นี้
         status_color = colors.get(node.status, '')
         node_line = (f"{prefix}├── {status_color}{node.name} "
-                    f"({node.status.name}){RESET}")
+                    f"({_STATUS_NAME[node.status]}){RESET}")
         output.append(node_line)
         
         # เพิ่มสถิติถ้ามี
@@ -1,47 +1,170 @@
 import sys
+import time
+from collections import defaultdict, deque
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QGraphicsItem,
     QDockWidget, QListWidget, QLineEdit, QFormLayout, QWidget, QPushButton, QGraphicsEllipseItem, QGraphicsLineItem
 )
-from PyQt6.QtCore import Qt, QPointF
-from PyQt6.QtGui import QPainter, QPen, QBrush
+from PyQt6.QtCore import Qt, QPointF, QRectF, QTimer
+from PyQt6.QtGui import QPainter, QPen, QBrush, QSurfaceFormat
+from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+
+_NODE_PEN = QPen(Qt.GlobalColor.black)
+_NODE_BRUSH = QBrush(Qt.GlobalColor.lightGray)
+_EDGE_PEN = QPen(Qt.GlobalColor.black, 2)
+_TEMP_PEN = QPen(Qt.GlobalColor.gray, 2, Qt.PenStyle.DashLine)
 
 class NodeItem(QGraphicsEllipseItem):
     def __init__(self, name, node_type, x=0, y=0):
         super().__init__(-50, -25, 100, 50)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
-        self.setPen(QPen(Qt.GlobalColor.black))
-        self.setBrush(QBrush(Qt.GlobalColor.lightGray))
-        self.name = name
-        self.node_type = node_type
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+        self.setPen(_NODE_PEN)
+        self.setBrush(_NODE_BRUSH)
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self._name = name
+        self._node_type = node_type
+        self.connections = []
+        self.on_moved = None
+        self._cached_center = QPointF(x, y)
+        self._cached_bbox = self.sceneBoundingRect()
         self.setToolTip(f"{node_type} Node: {name}")
         self.setPos(x, y)
 
+    def update_connections(self, visible_rect=None):
+        for connection in self.connections:
+            connection.update_position(visible_rect)
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            self._cached_bbox = self.sceneBoundingRect()
+            self._cached_center = self._cached_bbox.center()
+            if self.on_moved:
+                self.on_moved(self)
+        return super().itemChange(change, value)
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        self.setToolTip(f"{self._node_type} Node: {value}")
+        self.update()
+
+    @property
+    def node_type(self):
+        return self._node_type
+
+    @node_type.setter
+    def node_type(self, value):
+        self._node_type = value
+        self.setToolTip(f"{value} Node: {self._name}")
+        self.update()
+
     def __repr__(self):
         return f"NodeItem(name={self.name}, type={self.node_type})"
 
+# Half the edge pen width, so culling matches what is actually painted
+_EDGE_MARGIN = max(_EDGE_PEN.widthF(), 1.0) / 2
+
+def _segment_rect(p1, p2):
+    # A horizontal or vertical segment has a zero-area bounding rect, which
+    # QRectF.intersects() never reports as intersecting, so pad it by the pen
+    return QRectF(p1, p2).normalized().adjusted(
+        -_EDGE_MARGIN, -_EDGE_MARGIN, _EDGE_MARGIN, _EDGE_MARGIN
+    )
+
 class ConnectionItem(QGraphicsLineItem):
     def __init__(self, source_node, target_node):
         super().__init__()
         self.source_node = source_node
         self.target_node = target_node
-        self.setPen(QPen(Qt.GlobalColor.black, 2))
+        self.setPen(_EDGE_PEN)
+        self.stale = False
+        source_node.connections.append(self)
+        target_node.connections.append(self)
         self.update_position()
 
-    def update_position(self):
-        source_center = self.source_node.sceneBoundingRect().center()
-        target_center = self.target_node.sceneBoundingRect().center()
+    def detach(self):
+        for node in (self.source_node, self.target_node):
+            if self in node.connections:
+                node.connections.remove(self)
+
+    def update_position(self, visible_rect=None):
+        source_center = self.source_node._cached_center
+        target_center = self.target_node._cached_center
+        if visible_rect is not None:
+            new_rect = _segment_rect(source_center, target_center)
+            old_rect = _segment_rect(self.line().p1(), self.line().p2())
+            # Both the new and the old segment are off-screen: defer until visible
+            if not new_rect.intersects(visible_rect) and not old_rect.intersects(visible_rect):
+                self.stale = True
+                return
+        self.stale = False
         self.setLine(source_center.x(), source_center.y(), target_center.x(), target_center.y())
 
+class SpatialGrid:
+    """Uniform grid of item bounding boxes for point hit-testing"""
+
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)
+        self._item_cells = {}
+
+    def _cells_for(self, rect):
+        x0, y0, x1, y1 = rect.getCoords()
+        size = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(int(x0 // size), int(x1 // size) + 1)
+            for cy in range(int(y0 // size), int(y1 // size) + 1)
+        ]
+
+    def insert(self, item, rect):
+        self.remove(item)
+        cells = self._cells_for(rect)
+        for cell in cells:
+            self._cells[cell].add(item)
+        self._item_cells[item] = cells
+
+    def remove(self, item):
+        for cell in self._item_cells.pop(item, ()):
+            bucket = self._cells[cell]
+            bucket.discard(item)
+            if not bucket:
+                del self._cells[cell]
+
+    def query(self, point):
+        size = self.cell_size
+        return self._cells.get((int(point.x() // size), int(point.y() // size)), ())
+
+def _with_room(buf, count):
+    """Return buf with space for one more row, doubling its capacity when full"""
+    if count < len(buf):
+        return buf
+    grown = np.empty((max(16, 2 * len(buf)), buf.shape[1]), buf.dtype)
+    grown[:count] = buf[:count]
+    return grown
+
+
 class BehaviorTreeEditor(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Behavior Tree Editor")
         self.setGeometry(100, 100, 1200, 800)
 
-        self.scene = QGraphicsScene()
+        self.scene = QGraphicsScene(self)
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.view = QGraphicsView(self.scene)
+        self.view.setViewport(QOpenGLWidget())
+        self.view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
         self.setCentralWidget(self.view)
 
         self.scene.setSceneRect(0, 0, 2000, 2000)
@@ -52,7 +175,39 @@ class BehaviorTreeEditor(QMainWindow):
         self._setup_undo_redo()
 
         self.selected_node = None
-        self.temp_connection = None
+        self._temp_connection = QGraphicsLineItem()
+        self._temp_connection.setPen(_TEMP_PEN)
+        self._temp_connection.setVisible(False)
+        self.scene.addItem(self._temp_connection)
+        self._nodes = []
+        self._node_counter = 0
+        self._connections = []
+        self._visible_rect = None
+        # Index method, BSP depth and per-node movable flags saved by
+        # enter_simulation_mode(); None while editing
+        self._edit_state = None
+        # Node centers and connection endpoints (as node rows) for batch refreshes.
+        # Both are capacity-doubling buffers; only the first _node_rows/_edge_count
+        # rows are live, and _edges rows line up with _connections
+        self._pos = np.zeros((0, 2), np.float32) if np is not None else None
+        self._edges = np.zeros((0, 2), np.int32) if np is not None else None
+        self._node_rows = 0
+        self._edge_count = 0
+        self._refresh_pending = False
+        # Kept up to date by selectionChanged so moves don't rescan the scene
+        self._selection_count = 0
+        self.scene.selectionChanged.connect(self._on_selection_changed)
+        self._last_move_ns = 0
+        self._move_min_ns = 16_000_000
+        # Trailing update for moves dropped by the throttle
+        self._pending_move_pos = None
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.timeout.connect(self._flush_temp_connection)
+        for scroll_bar in (self.view.horizontalScrollBar(), self.view.verticalScrollBar()):
+            scroll_bar.valueChanged.connect(self._update_visible_rect)
+            scroll_bar.rangeChanged.connect(self._update_visible_rect)
+        self._index = SpatialGrid()
 
     def _create_node_palette(self):
         dock = QDockWidget("Node Palette", self)
@@ -84,20 +239,104 @@ class BehaviorTreeEditor(QMainWindow):
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
 
     def _setup_undo_redo(self):
-        self.undo_stack = []
-        self.redo_stack = []
+        self.undo_stack = deque(maxlen=200)
+        self.redo_stack = deque(maxlen=200)
 
     def _add_node_from_palette(self, item):
         node_type = item.text()
-        node_name = f"{node_type}_{len(self.scene.items())}"
+        self._node_counter += 1
+        node_name = f"{node_type}_{self._node_counter}"
         node = NodeItem(node_name, node_type, x=100, y=100)
         self.scene.addItem(node)
+        self._nodes.append(node)
+        if np is not None:
+            self._pos = _with_room(self._pos, self._node_rows)
+            node.row = self._node_rows
+            self._node_rows += 1
+            center = node._cached_center
+            self._pos[node.row] = (center.x(), center.y())
+        node.on_moved = self._on_node_moved
+        self._index_node(node)
         node.setSelected(True)
         self._update_properties(node)
-        self._add_to_undo_stack(lambda: self.scene.removeItem(node))
+        self._add_to_undo_stack(lambda: self._remove_node(node))
+
+    def _remove_node(self, node):
+        if node in self._nodes:
+            self.scene.removeItem(node)
+            self._nodes.remove(node)
+            self._index.remove(node)
+            for connection in list(node.connections):
+                self._remove_connection(connection)
+
+    def _add_connection(self, source_node, target_node):
+        connection = ConnectionItem(source_node, target_node)
+        self.scene.addItem(connection)
+        self._connections.append(connection)
+        if np is not None:
+            self._edges = _with_room(self._edges, self._edge_count)
+            self._edges[self._edge_count] = (source_node.row, target_node.row)
+            self._edge_count += 1
+        return connection
+
+    def _remove_connection(self, connection):
+        if connection in self._connections:
+            self.scene.removeItem(connection)
+            index = self._connections.index(connection)
+            # Swap the last connection into the freed slot so no rows shift
+            last = len(self._connections) - 1
+            self._connections[index] = self._connections[last]
+            self._connections.pop()
+            if np is not None:
+                self._edges[index] = self._edges[last]
+                self._edge_count -= 1
+            connection.detach()
+
+    def _refresh_all_connections(self):
+        self._refresh_pending = False
+        if np is None:
+            for connection in self._connections:
+                connection.update_position()
+            return
+        segments = self._pos[self._edges[:self._edge_count]].reshape(-1, 4).tolist()
+        for connection, (x1, y1, x2, y2) in zip(self._connections, segments):
+            connection.stale = False
+            connection.setLine(x1, y1, x2, y2)
+
+    def _index_node(self, node):
+        self._index.insert(node, node._cached_bbox)
+
+    def _on_selection_changed(self):
+        self._selection_count = len(self.scene.selectedItems())
+
+    def _on_node_moved(self, node):
+        self._index_node(node)
+        if np is not None:
+            center = node._cached_center
+            self._pos[node.row] = (center.x(), center.y())
+        if self._selection_count > 1:
+            # Several nodes are being dragged together: refresh every connection
+            # once after this batch of moves instead of per node
+            if not self._refresh_pending:
+                self._refresh_pending = True
+                QTimer.singleShot(0, self._refresh_all_connections)
+        else:
+            node.update_connections(self._visible_rect)
+
+    def _update_visible_rect(self):
+        self._visible_rect = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        for connection in self._connections:
+            if connection.stale:
+                connection.update_position(self._visible_rect)
+
+    def _node_at(self, pos):
+        hits = [node for node in self._index.query(pos) if node.contains(node.mapFromScene(pos))]
+        if not hits:
+            return None
+        return max(hits, key=lambda node: (node.zValue(), self._nodes.index(node)))
 
     def _update_properties(self, node):
-        if isinstance(node, NodeItem):
+        if node is not None and node.__class__ is NodeItem:
             self.name_field.setText(node.name)
             self.type_field.setText(node.node_type)
 
@@ -107,16 +346,13 @@ class BehaviorTreeEditor(QMainWindow):
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            item = self.scene.itemAt(self.view.mapToScene(event.pos()), self.view.transform())
-            if isinstance(item, NodeItem):
-                if self.temp_connection:
-                    self.scene.removeItem(self.temp_connection)
-                    self.temp_connection = None
+            item = self._node_at(self.view.mapToScene(event.pos()))
+            if item is not None:
+                self._temp_connection.setVisible(False)
 
                 if self.selected_node and self.selected_node != item:
-                    connection = ConnectionItem(self.selected_node, item)
-                    self.scene.addItem(connection)
-                    self._add_to_undo_stack(lambda: self.scene.removeItem(connection))
+                    connection = self._add_connection(self.selected_node, item)
+                    self._add_to_undo_stack(lambda: self._remove_connection(connection))
                     self.selected_node = None
                 else:
                     self.selected_node = item
@@ -125,28 +361,40 @@ class BehaviorTreeEditor(QMainWindow):
         elif event.button() == Qt.MouseButton.RightButton:
             if self.selected_node:
                 pos = self.view.mapToScene(event.pos())
-                self.temp_connection = QGraphicsLineItem(
-                    self.selected_node.sceneBoundingRect().center().x(),
-                    self.selected_node.sceneBoundingRect().center().y(),
-                    pos.x(), pos.y()
+                source_center = self.selected_node._cached_center
+                self._temp_connection.setLine(
+                    source_center.x(), source_center.y(), pos.x(), pos.y()
                 )
-                self.temp_connection.setPen(QPen(Qt.GlobalColor.gray, 2, Qt.PenStyle.DashLine))
-                self.scene.addItem(self.temp_connection)
+                self._temp_connection.setVisible(True)
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
-        if self.temp_connection:
-            pos = self.view.mapToScene(event.pos())
-            source_center = self.selected_node.sceneBoundingRect().center()
-            self.temp_connection.setLine(
-                source_center.x(), source_center.y(), pos.x(), pos.y()
-            )
+        if self._temp_connection.isVisible():
+            self._pending_move_pos = self.view.mapToScene(event.pos())
+            elapsed = time.monotonic_ns() - self._last_move_ns
+            if elapsed < self._move_min_ns:
+                # Throttled: draw the latest position once the window closes
+                if not self._move_timer.isActive():
+                    self._move_timer.start((self._move_min_ns - elapsed) // 1_000_000 + 1)
+            else:
+                self._flush_temp_connection()
         super().mouseMoveEvent(event)
 
+    def _flush_temp_connection(self):
+        self._move_timer.stop()
+        pos = self._pending_move_pos
+        self._pending_move_pos = None
+        if pos is None or not self._temp_connection.isVisible():
+            return
+        self._last_move_ns = time.monotonic_ns()
+        source_center = self.selected_node._cached_center
+        self._temp_connection.setLine(
+            source_center.x(), source_center.y(), pos.x(), pos.y()
+        )
+
     def mouseReleaseEvent(self, event):
-        if event.button() == Qt.MouseButton.RightButton and self.temp_connection:
-            self.scene.removeItem(self.temp_connection)
-            self.temp_connection = None
+        if event.button() == Qt.MouseButton.RightButton:
+            self._temp_connection.setVisible(False)
         super().mouseReleaseEvent(event)
 
     def undo(self):
@@ -162,17 +410,55 @@ class BehaviorTreeEditor(QMainWindow):
             action()
 
     def tick(self):
+        nodes = set(self._nodes)
         for item in self.scene.selectedItems():
-            if isinstance(item, NodeItem):
+            if item in nodes:
                 print(f"Ticking Node: {item}")
 
-    def run_simulation(self):
+    def enter_simulation_mode(self):
+        # For simulations that run across event-loop turns while the scene is
+        # painted and hit-tested: nodes stay put, so a BSP index pays off.
+        # Call exit_simulation_mode() when editing resumes
+        if self._edit_state is not None:
+            return
+        movable = QGraphicsItem.GraphicsItemFlag.ItemIsMovable
+        self._edit_state = (
+            self.scene.itemIndexMethod(),
+            self.scene.bspTreeDepth(),
+            [(node, bool(node.flags() & movable)) for node in self._nodes],
+        )
+        for node in self._nodes:
+            node.setFlag(movable, False)
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+        self.scene.setBspTreeDepth(0)
+
+    def exit_simulation_mode(self):
+        if self._edit_state is None:
+            return
+        index_method, bsp_depth, movable_flags = self._edit_state
+        self._edit_state = None
+        # The depth can only be set while the scene still uses the BSP index
+        self.scene.setBspTreeDepth(bsp_depth)
+        self.scene.setItemIndexMethod(index_method)
+        for node, movable in movable_flags:
+            node.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, movable)
+
+    def run_simulation(self, visible_only=False):
+        # One synchronous pass: nothing queries the scene meanwhile, so this
+        # does not switch to simulation mode (that would only rebuild the index twice)
         print("Running simulation...")
-        for item in self.scene.items():
-            if isinstance(item, NodeItem):
-                print(f"Simulating Node: {item}")
+        nodes = self._nodes
+        if visible_only:
+            visible_rect = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+            nodes = [node for node in nodes if visible_rect.intersects(node._cached_bbox)]
+        for node in nodes:
+            print(f"Simulating Node: {node}")
 
 if __name__ == "__main__":
+    surface_format = QSurfaceFormat()
+    surface_format.setSamples(4)
+    QSurfaceFormat.setDefaultFormat(surface_format)
+
     app = QApplication(sys.argv)
     window = BehaviorTreeEditor()
     window.show()
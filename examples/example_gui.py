@@ -1,6 +1,12 @@
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from typing import NamedTuple
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QTreeWidget, QTreeWidgetItem, QLabel, QLineEdit,
@@ -10,8 +16,6 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QMimeData, QPoint
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QAction
 
-sys.path.append(str(Path(__file__).parent.parent))
-
 from behavior_tree import (
     NodeStatus,
     SequenceNode,
@@ -23,13 +27,35 @@ from behavior_tree import (
     TimeoutNode
 )
 
+class NodeData(NamedTuple):
+    """Node payload stored on each tree item; children come from the item tree"""
+    type: str
+    name: str
+    properties: dict
+
 class NodeTypeDialog(QDialog):
     """Dialog for selecting node type and properties"""
+
+    # Property rows shown for each node type
+    PROPERTY_NAMES = {
+        "ParallelNode": ["Policy"],
+        "RetryNode": ["Max Attempts"],
+        "TimeoutNode": ["Timeout"],
+        "ActionNode": ["Function"],
+        "ConditionNode": ["Function"]
+    }
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Add Node")
         self.setModal(True)
 
+        # Property widgets are created once and reused when the type changes
+        self._widget_pool = {}
+        self._label_pool = {}
+        # Property name -> field widget for the rows currently shown
+        self._prop_widgets = {}
+
         # Node types
         self.node_types = {
             "Composite Nodes": [
@@ -82,52 +108,60 @@ class NodeTypeDialog(QDialog):
 
     def update_properties(self, node_type: str):
         """Update property fields based on node type"""
-        # Clear existing properties
-        while self.properties_layout.count():
-            item = self.properties_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        # Detach existing rows; the widgets stay pooled for reuse
+        while self.properties_layout.rowCount():
+            row = self.properties_layout.takeRow(0)
+            for item in (row.labelItem, row.fieldItem):
+                if item is not None and item.widget():
+                    item.widget().hide()
+
+        self._prop_widgets = {}
 
         # Add properties based on node type
-        if node_type == "ParallelNode":
-            policy_combo = QComboBox()
-            policy_combo.addItems(["REQUIRE_ALL", "REQUIRE_ONE"])
-            self.properties_layout.addRow("Policy:", policy_combo)
-
-        elif node_type == "RetryNode":
-            attempts = QLineEdit("3")
-            attempts.setPlaceholderText("Number of attempts")
-            self.properties_layout.addRow("Max Attempts:", attempts)
-
-        elif node_type == "TimeoutNode":
-            timeout = QLineEdit("1.0")
-            timeout.setPlaceholderText("Timeout in seconds")
-            self.properties_layout.addRow("Timeout:", timeout)
-
-        elif node_type in ["ActionNode", "ConditionNode"]:
-            func_name = QLineEdit()
-            func_name.setPlaceholderText("Function name")
-            self.properties_layout.addRow("Function:", func_name)
+        for prop_name in self.PROPERTY_NAMES.get(node_type, []):
+            label = self._label_pool.get(prop_name)
+            if label is None:
+                label = self._label_pool[prop_name] = QLabel(f"{prop_name}:")
+            field = self._build_prop_widget(node_type, prop_name)
+            self.properties_layout.addRow(label, field)
+            label.show()
+            field.show()
+            self._prop_widgets[prop_name] = field
+
+    def _build_prop_widget(self, node_type: str, prop_name: str) -> QWidget:
+        """Return the pooled field widget for a property, creating it on first use"""
+        key = (node_type, prop_name)
+        widget = self._widget_pool.get(key)
+        if widget is not None:
+            return widget
+
+        if prop_name == "Policy":
+            widget = QComboBox()
+            widget.addItems(["REQUIRE_ALL", "REQUIRE_ONE"])
+        elif prop_name == "Max Attempts":
+            widget = QLineEdit("3")
+            widget.setPlaceholderText("Number of attempts")
+        elif prop_name == "Timeout":
+            widget = QLineEdit("1.0")
+            widget.setPlaceholderText("Timeout in seconds")
+        else:
+            widget = QLineEdit()
+            widget.setPlaceholderText("Function name")
+
+        self._widget_pool[key] = widget
+        return widget
 
     def get_node_data(self) -> dict:
         """Get node configuration data"""
-        data = {
+        return {
             "type": self.type_combo.currentText(),
             "name": self.name_edit.text(),
-            "properties": {}
+            "properties": {
+                name: field.text() if isinstance(field, QLineEdit) else field.currentText()
+                for name, field in self._prop_widgets.items()
+            }
         }
 
-        # Collect properties
-        for i in range(self.properties_layout.rowCount()):
-            label = self.properties_layout.itemAt(i*2).widget()
-            field = self.properties_layout.itemAt(i*2+1).widget()
-            if isinstance(field, QLineEdit):
-                data["properties"][label.text().rstrip(":")] = field.text()
-            elif isinstance(field, QComboBox):
-                data["properties"][label.text().rstrip(":")] = field.currentText()
-
-        return data
-
 class TreeEditorWidget(QTreeWidget):
     """Custom TreeWidget for behavior tree editing"""
     def __init__(self):
@@ -222,11 +256,11 @@ class BehaviorTreeEditor(QMainWindow):
         """Add new node to tree"""
         dialog = NodeTypeDialog(self)
         if dialog.exec():
-            data = dialog.get_node_data()
+            data = NodeData(**dialog.get_node_data())
             item = QTreeWidgetItem([
-                data["name"],
-                data["type"],
-                str(data["properties"])
+                data.name,
+                data.type,
+                str(data.properties)
             ])
             
             # Store node data
@@ -252,8 +286,11 @@ class BehaviorTreeEditor(QMainWindow):
         """Save tree to JSON file"""
         data = self._serialize_tree()
         try:
-            with open("behavior_tree.json", "w") as f:
-                json.dump(data, f, indent=2)
+            path = Path("behavior_tree.json")
+            if orjson is not None:
+                path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                path.write_text(json.dumps(data, indent=2))
             QMessageBox.information(
                 self,
                 "Success",
@@ -269,10 +306,11 @@ class BehaviorTreeEditor(QMainWindow):
     def load_tree(self):
         """Load tree from JSON file"""
         try:
-            with open("behavior_tree.json", "r") as f:
-                data = json.load(f)
-            self.tree.clear()
-            self._deserialize_tree(data)
+            raw = Path("behavior_tree.json").read_bytes()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            with self._batch_update():
+                self.tree.clear()
+                self._deserialize_tree(data)
             QMessageBox.information(
                 self,
                 "Success",
@@ -311,68 +349,80 @@ class BehaviorTreeEditor(QMainWindow):
         dialog = NodeTypeDialog(self)
         
         # Set current values
-        dialog.type_combo.setCurrentText(data["type"])
-        dialog.name_edit.setText(data["name"])
-        dialog.update_properties(data["type"])
+        dialog.type_combo.setCurrentText(data.type)
+        dialog.name_edit.setText(data.name)
+        dialog.update_properties(data.type)
 
         # Set property values
-        for i in range(dialog.properties_layout.rowCount()):
-            label = dialog.properties_layout.itemAt(i*2).widget()
-            field = dialog.properties_layout.itemAt(i*2+1).widget()
-            prop_name = label.text().rstrip(":")
-            if prop_name in data["properties"]:
-                if isinstance(field, QLineEdit):
-                    field.setText(str(data["properties"][prop_name]))
-                elif isinstance(field, QComboBox):
-                    field.setCurrentText(data["properties"][prop_name])
+        for prop_name, value in data.properties.items():
+            field = dialog._prop_widgets.get(prop_name)
+            if isinstance(field, QLineEdit):
+                field.setText(str(value))
+            elif isinstance(field, QComboBox):
+                field.setCurrentText(value)
 
         if dialog.exec():
-            new_data = dialog.get_node_data()
-            item.setText(0, new_data["name"])
-            item.setText(1, new_data["type"])
-            item.setText(2, str(new_data["properties"]))
+            new_data = NodeData(**dialog.get_node_data())
+            item.setText(0, new_data.name)
+            item.setText(1, new_data.type)
+            item.setText(2, str(new_data.properties))
             item.setData(0, Qt.ItemDataRole.UserRole, new_data)
 
+    @contextmanager
+    def _batch_update(self):
+        """Suspend repaints, signals and sorting while the tree is rebuilt"""
+        updates_enabled = self.tree.updatesEnabled()
+        sorting_enabled = self.tree.isSortingEnabled()
+        self.tree.setUpdatesEnabled(False)
+        signals_blocked = self.tree.blockSignals(True)
+        self.tree.setSortingEnabled(False)
+        try:
+            yield
+        finally:
+            self.tree.setSortingEnabled(sorting_enabled)
+            self.tree.blockSignals(signals_blocked)
+            self.tree.setUpdatesEnabled(updates_enabled)
+
     def _serialize_tree(self) -> dict:
         """Convert tree to dictionary"""
-        def serialize_item(item: QTreeWidgetItem) -> dict:
-            data = item.data(0, Qt.ItemDataRole.UserRole)
-            node_data = {
-                "type": data["type"],
-                "name": data["name"],
-                "properties": data["properties"],
-                "children": []
-            }
-            
-            for i in range(item.childCount()):
-                node_data["children"].append(
-                    serialize_item(item.child(i))
-                )
-            return node_data
-
         root_data = {"children": []}
-        for i in range(self.tree.topLevelItemCount()):
-            root_data["children"].append(
-                serialize_item(self.tree.topLevelItem(i))
+        # (item, list its data is appended to); pushed in reverse to keep sibling order
+        stack = [
+            (self.tree.topLevelItem(i), root_data["children"])
+            for i in reversed(range(self.tree.topLevelItemCount()))
+        ]
+        while stack:
+            item, siblings = stack.pop()
+            node_data = item.data(0, Qt.ItemDataRole.UserRole)._asdict()
+            node_data["children"] = []
+            siblings.append(node_data)
+            stack.extend(
+                (item.child(i), node_data["children"])
+                for i in reversed(range(item.childCount()))
             )
         return root_data
 
     def _deserialize_tree(self, data: dict):
         """Load tree from dictionary"""
-        def create_item(node_data: dict) -> QTreeWidgetItem:
-            item = QTreeWidgetItem([
-                node_data["name"],
-                node_data["type"],
-                str(node_data["properties"])
-            ])
-            item.setData(0, Qt.ItemDataRole.UserRole, node_data)
-            
-            for child_data in node_data["children"]:
-                item.addChild(create_item(child_data))
-            return item
-
-        for node_data in data["children"]:
-            self.tree.addTopLevelItem(create_item(node_data))
+        # (parent item or None for top level, node data)
+        stack = [(None, node_data) for node_data in reversed(data["children"])]
+        with self._batch_update():
+            while stack:
+                parent, node_data = stack.pop()
+                item = QTreeWidgetItem([
+                    node_data["name"],
+                    node_data["type"],
+                    str(node_data["properties"])
+                ])
+                item.setData(0, Qt.ItemDataRole.UserRole, NodeData(
+                    node_data["type"], node_data["name"], node_data["properties"]
+                ))
+
+                if parent is None:
+                    self.tree.addTopLevelItem(item)
+                else:
+                    parent.addChild(item)
+                stack.extend((item, child) for child in reversed(node_data["children"]))
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1,15 +1,61 @@
+import argparse
 import asyncio
-import sys
 import logging
-from datetime import datetime
-from pathlib import Path
+from datetime import timedelta
+import time
 import random
 from enum import Enum, auto
 import curses
+import locale
 import math
+import numpy as np
 
-# Add project root to Python path
-sys.path.append(str(Path(__file__).parent.parent))
+# Spatial query backends (pip install -e ".[examples]" for scipy and numba):
+# worlds with at least _KDTREE_MIN_POINTS enemies/covers use scipy KD-trees;
+# smaller ones, or any world without scipy, scan every entity with the numba
+# kernels below, or with plain numpy expressions when numba is missing.
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _nearest_kernel(xy, px, py):
+        """Index of and distance to the row of xy closest to (px, py)"""
+        best_idx, best_dist = -1, np.inf
+        for i in range(xy.shape[0]):
+            d = math.hypot(xy[i, 0] - px, xy[i, 1] - py)
+            if d < best_dist:
+                best_idx, best_dist = i, d
+        return best_idx, best_dist
+
+    @njit(cache=True, fastmath=True)
+    def _best_cover_kernel(cxy, cprot, px, py, tx, ty):
+        """Cover index minimising distance-to-self minus protected distance-to-target"""
+        best_idx, best_score = -1, np.inf
+        for i in range(cxy.shape[0]):
+            score = (math.hypot(cxy[i, 0] - px, cxy[i, 1] - py)
+                     - math.hypot(cxy[i, 0] - tx, cxy[i, 1] - ty) * cprot[i])
+            if score < best_score:
+                best_idx, best_score = i, score
+        return best_idx
+else:
+    _nearest_kernel = _best_cover_kernel = None
+
+# Below this many points a brute-force scan beats a KD-tree query
+_KDTREE_MIN_POINTS = 2048 if njit is not None else 1024
+
+# Shared generator for batched world setup and per-agent random buffers
+_RNG = np.random.default_rng()
+_RNG_BUF_SIZE = 4096
+
+# Skip simulated delays and advance a virtual clock instead (--fast)
+USE_VIRTUAL_TIME = False
 
 from behavior_tree import (
     BehaviorTreeManager,
@@ -21,9 +67,9 @@ from behavior_tree import (
     BlackboardSetNode,
     ParallelPolicy,
     Blackboard,
-    RetryNode,
     TimeoutNode,
-    TreeVisualizer
+    TreeVisualizer,
+    install_uvloop
 )
 
 class EntityType(Enum):
@@ -32,7 +78,31 @@ class EntityType(Enum):
     ITEM = auto()
     COVER = auto()
 
+_YN = ('No', 'Yes')
+
+_REPORT_TMPL = """
+Game AI Status:
+Health: {health}/{max_health} HP
+Ammo: {ammo}/{max_ammo}
+Energy: {energy}/{max_energy}
+Position: {position}
+In Combat: {in_combat_yn}
+Current Target: {target_yn}
+Using Cover: {cover_yn}
+
+Statistics:
+Shots Fired: {shots_fired}
+Hits: {hits}
+Accuracy: {accuracy:.1f}%
+Damage Dealt: {damage_dealt:.1f}
+Distance Traveled: {distance_traveled:.1f}
+Items Collected: {items_collected}
+Active Time: {active_time}
+"""
+
 class GameEntity:
+    __slots__ = ("type", "position", "properties")
+
     def __init__(self, entity_type: EntityType, position: tuple, properties: dict = None):
         self.type = entity_type
         self.position = position
@@ -41,6 +111,22 @@ class GameEntity:
 class GameAI:
     """Complex game AI with multiple behaviors and states"""
     
+    __slots__ = (
+        "health", "max_health", "ammo", "max_ammo", "energy", "max_energy",
+        "position", "direction",
+        "enemies", "items", "covers",
+        "enemy_xy", "enemy_health", "cover_xy", "cover_protection",
+        "_enemy_tree", "_cover_tree",
+        "in_combat", "current_target", "target_idx", "current_cover",
+        "last_known_enemy_position", "detection_range", "cover_candidates",
+        "damage", "accuracy", "stealth", "detected",
+        "last_attack_time", "last_heal_time", "_now", "_sim_t",
+        "attack_cooldown", "heal_cooldown",
+        "tick_every_n", "_dirty", "_nearest_enemy_dist",
+        "_rng_buf", "_rng_idx",
+        "stats", "logger",
+    )
+    
     def __init__(self):
         # Character stats
         self.health = 100
@@ -58,8 +144,11 @@ class GameAI:
         self.covers = []   # List of GameEntity
         self.in_combat = False
         self.current_target = None
+        self.target_idx = None
         self.current_cover = None
         self.last_known_enemy_position = None
+        self.detection_range = 15.0
+        self.cover_candidates = 4
         
         # Combat stats
         self.damage = 10
@@ -68,11 +157,25 @@ class GameAI:
         self.detected = False
         
         # Cooldowns and timers
-        self.last_attack_time = 0
-        self.last_heal_time = 0
+        self.last_attack_time = float('-inf')
+        self.last_heal_time = float('-inf')
+        # Monotonic loop time, set by the game loop right before each tree tick
+        self._now = 0.0
+        # Simulated seconds spent waiting during the current tick (virtual time)
+        self._sim_t = 0.0
         self.attack_cooldown = 1.0
         self.heal_cooldown = 5.0
         
+        # Tick scheduling: the tree is ticked every tick_every_n frames, or on
+        # the next frame when _dirty is set by a state change the tree tests
+        self.tick_every_n = 5
+        self._dirty = False
+        self._nearest_enemy_dist = float('inf')
+        
+        # Pre-generated uniform floats for combat rolls, refilled in one batch
+        self._rng_buf = _RNG.random(_RNG_BUF_SIZE).tolist()
+        self._rng_idx = 0
+        
         # Statistics
         self.stats = {
             'shots_fired': 0,
@@ -81,7 +184,7 @@ class GameAI:
             'damage_taken': 0,
             'items_collected': 0,
             'distance_traveled': 0,
-            'start_time': datetime.now()
+            'start_time': time.monotonic()
         }
         
         self.logger = logging.getLogger("GameAI")
@@ -91,73 +194,158 @@ class GameAI:
 
     def _setup_game_world(self):
         """Initialize game entities"""
+        n_enemies, n_items, n_covers = 3, 5, 4
+        
         # Add some enemies
+        enemy_pos = _RNG.uniform(-20, 20, (n_enemies, 2))
         self.enemies = [
-            GameEntity(EntityType.ENEMY, (random.uniform(-20, 20), random.uniform(-20, 20)),
-                      {'health': 100, 'ammo': 50})
-            for _ in range(3)
+            GameEntity(EntityType.ENEMY, tuple(p), {'health': 100, 'ammo': 50})
+            for p in enemy_pos.tolist()
         ]
         
         # Add items (health, ammo, etc.)
+        item_pos = _RNG.uniform(-20, 20, (n_items, 2))
+        item_types = _RNG.choice(['health', 'ammo', 'energy'], n_items)
         self.items = [
-            GameEntity(EntityType.ITEM, (random.uniform(-20, 20), random.uniform(-20, 20)),
-                      {'type': random.choice(['health', 'ammo', 'energy'])})
-            for _ in range(5)
+            GameEntity(EntityType.ITEM, tuple(p), {'type': t})
+            for p, t in zip(item_pos.tolist(), item_types.tolist())
         ]
         
         # Add cover positions
+        cover_pos = _RNG.uniform(-20, 20, (n_covers, 2))
+        protection = _RNG.uniform(0.3, 0.8, n_covers)
         self.covers = [
-            GameEntity(EntityType.COVER, (random.uniform(-20, 20), random.uniform(-20, 20)),
-                      {'protection': random.uniform(0.3, 0.8)})
-            for _ in range(4)
+            GameEntity(EntityType.COVER, tuple(p), {'protection': pr})
+            for p, pr in zip(cover_pos.tolist(), protection.tolist())
         ]
 
+        # Structure-of-arrays copies used for vectorized distance queries;
+        # the GameEntity lists above are kept as the view layer
+        self.enemy_xy = enemy_pos.astype(np.float32)
+        self.enemy_health = np.full(n_enemies, 100, dtype=np.float32)
+        self.cover_xy = cover_pos.astype(np.float32)
+        self.cover_protection = protection.astype(np.float32)
+        self._rebuild_spatial_index()
+
+    def _rebuild_spatial_index(self):
+        """Rebuild the KD-trees over enemy/cover positions (call after entities move)"""
+        self._enemy_tree = None
+        self._cover_tree = None
+        if cKDTree is None:
+            return
+        if len(self.enemy_xy) >= _KDTREE_MIN_POINTS:
+            self._enemy_tree = cKDTree(self.enemy_xy)
+        if len(self.cover_xy) >= _KDTREE_MIN_POINTS:
+            self._cover_tree = cKDTree(self.cover_xy)
+
+    async def _wait(self, seconds: float):
+        """Simulated delay: a real sleep, or just virtual time with --fast"""
+        if USE_VIRTUAL_TIME:
+            self._sim_t += seconds
+        else:
+            await asyncio.sleep(seconds)
+
     def _calculate_distance(self, pos1: tuple, pos2: tuple) -> float:
         """Calculate distance between two positions"""
-        return math.sqrt((pos2[0] - pos1[0])**2 + (pos2[1] - pos1[1])**2)
+        return math.hypot(pos2[0] - pos1[0], pos2[1] - pos1[1])
 
-    async def scan_for_enemies(self) -> bool:
-        """Scan surrounding area for enemies"""
-        self.logger.info("Scanning for enemies...")
-        await asyncio.sleep(0.5)
+    def _distances_to(self, xy_arr: np.ndarray) -> np.ndarray:
+        """Distances from the current position to every row of an (N, 2) array"""
+        return np.hypot(xy_arr[:, 0] - self.position[0], xy_arr[:, 1] - self.position[1])
+
+    async def scan_for_enemies(self, max_attempts: int = 3) -> bool:
+        """Scan surrounding area for enemies, rescanning up to max_attempts times
         
-        for enemy in self.enemies:
-            distance = self._calculate_distance(self.position, enemy.position)
-            if distance < 15:  # Detection range
+        The retry lives here rather than in a RetryNode; a rescan can still
+        succeed because move_to_cover runs alongside it and shifts position.
+        """
+        for _ in range(max_attempts):
+            self.logger.info("Scanning for enemies...")
+            await self._wait(0.5)
+            
+            distance, idx = float('inf'), None
+            if self._enemy_tree is not None:
+                # Unbounded so the distance is also usable for tick-rate LOD
+                distance, idx = self._enemy_tree.query(self.position, k=1)
+            elif _nearest_kernel is not None and len(self.enemy_xy):
+                idx, distance = _nearest_kernel(self.enemy_xy, *map(float, self.position))
+            elif len(self.enemy_xy):
+                distances = self._distances_to(self.enemy_xy)
+                idx = int(np.argmin(distances))
+                distance = distances[idx]
+            self._nearest_enemy_dist = float(distance)
+            
+            if distance < self.detection_range:
+                idx = int(idx)
+                enemy = self.enemies[idx]
                 self.current_target = enemy
+                self.target_idx = idx
                 self.last_known_enemy_position = enemy.position
+                self._dirty = self._dirty or not self.in_combat
                 self.in_combat = True
                 self.logger.info(f"Enemy detected at distance {distance:.1f}")
                 return True
         
+        self._dirty = self._dirty or self.in_combat
         self.in_combat = False
         return False
 
+    def _next_rand(self) -> float:
+        """Next float in [0, 1) from the pre-generated buffer"""
+        if self._rng_idx == _RNG_BUF_SIZE:
+            self._rng_buf = _RNG.random(_RNG_BUF_SIZE).tolist()
+            self._rng_idx = 0
+        value = self._rng_buf[self._rng_idx]
+        self._rng_idx += 1
+        return value
+
+    def _tick_interval(self) -> int:
+        """Frames between tree ticks, based on how close the nearest enemy is
+        
+        Level-of-detail ticking in the spirit of a spatial ticker: close
+        combat ticks every frame, a quiet area only every 20 frames.
+        """
+        d = self._nearest_enemy_dist
+        return 1 if d < 5 else 3 if d < 15 else 10 if d < 30 else 20
+
+    @staticmethod
+    def _best_cover(cover_distances, cover_xy, protection, tx, ty) -> int:
+        """Position of the best-scoring cover among the given rows"""
+        enemy_distances = np.hypot(cover_xy[:, 0] - tx, cover_xy[:, 1] - ty)
+        # Score based on distance and protection
+        return int(np.argmin(cover_distances - enemy_distances * protection))
+
     async def find_cover(self) -> bool:
         """Find nearest suitable cover position"""
-        if not self.covers:
+        if not self.covers or not self.current_target:
             return False
-            
-        best_cover = None
-        best_score = float('inf')
         
-        for cover in self.covers:
-            distance = self._calculate_distance(self.position, cover.position)
-            if self.current_target:
-                enemy_distance = self._calculate_distance(cover.position, 
-                                                       self.current_target.position)
-                # Score based on distance and protection
-                score = distance - enemy_distance * cover.properties['protection']
-                if score < best_score:
-                    best_score = score
-                    best_cover = cover
+        tx, ty = self.current_target.position
+        if self._cover_tree is not None:
+            # Only score the nearest few covers
+            k = min(self.cover_candidates, len(self.covers))
+            cover_distances, candidates = self._cover_tree.query(self.position, k=k)
+            candidates = np.atleast_1d(candidates)
+            idx = int(candidates[self._best_cover(
+                np.atleast_1d(cover_distances), self.cover_xy[candidates],
+                self.cover_protection[candidates], tx, ty
+            )])
+        elif _best_cover_kernel is not None:
+            px, py = self.position
+            idx = _best_cover_kernel(
+                self.cover_xy, self.cover_protection,
+                float(px), float(py), float(tx), float(ty)
+            )
+        else:
+            # Score every cover straight off the SoA arrays, no gather copies
+            idx = self._best_cover(
+                self._distances_to(self.cover_xy), self.cover_xy,
+                self.cover_protection, tx, ty
+            )
         
-        if best_cover:
-            self.current_cover = best_cover
-            self.logger.info(f"Found cover with protection {best_cover.properties['protection']:.1f}")
-            return True
-            
-        return False
+        self.current_cover = self.covers[idx]
+        self.logger.info(f"Found cover with protection {self.current_cover.properties['protection']:.1f}")
+        return True
 
     async def move_to_position(self, target_pos: tuple) -> bool:
         """Move to specific position"""
@@ -168,7 +356,7 @@ class GameAI:
         
         # Simulate movement
         movement_time = distance * 0.1
-        await asyncio.sleep(movement_time)
+        await self._wait(movement_time)
         
         # Update position
         self.position = target_pos
@@ -178,13 +366,19 @@ class GameAI:
         self.logger.info(f"Moved to position {target_pos}, Energy: {self.energy:.1f}")
         return True
 
+    async def _move_to_current_cover(self) -> bool:
+        """Move to the cover picked by find_cover"""
+        return await self.move_to_position(
+            self.current_cover.position if self.current_cover else None
+        )
+
     async def attack_target(self) -> bool:
         """Attack current target"""
         if not self.current_target or self.ammo <= 0:
             return False
             
         # Check cooldown
-        current_time = datetime.now().timestamp()
+        current_time = self._now
         if current_time - self.last_attack_time < self.attack_cooldown:
             return False
             
@@ -198,12 +392,16 @@ class GameAI:
         
         # Attack
         self.ammo -= 1
+        if self.ammo == 0:
+            self._dirty = True
         self.stats['shots_fired'] += 1
         self.last_attack_time = current_time
         
-        if random.random() < hit_chance:
-            damage = self.damage * random.uniform(0.8, 1.2)
+        if self._next_rand() < hit_chance:
+            damage = self.damage * (0.8 + 0.4 * self._next_rand())
             self.current_target.properties['health'] -= damage
+            if self.target_idx is not None:
+                self.enemy_health[self.target_idx] = self.current_target.properties['health']
             self.stats['hits'] += 1
             self.stats['damage_dealt'] += damage
             self.logger.info(f"Hit target for {damage:.1f} damage!")
@@ -218,7 +416,7 @@ class GameAI:
             return False
             
         self.logger.info("Reloading weapon...")
-        await asyncio.sleep(2)
+        await self._wait(2)
         
         old_ammo = self.ammo
         self.ammo = self.max_ammo
@@ -232,15 +430,19 @@ class GameAI:
             return False
             
         # Check cooldown
-        current_time = datetime.now().timestamp()
+        current_time = self._now
         if current_time - self.last_heal_time < self.heal_cooldown:
             return False
             
         self.logger.info("Using medkit...")
-        await asyncio.sleep(1.5)
+        await self._wait(1.5)
         
         heal_amount = min(50, self.max_health - self.health)
+        was_healthy = self.health > 30
         self.health += heal_amount
+        # health_check in the tree tests health > 30
+        if was_healthy != (self.health > 30):
+            self._dirty = True
         self.last_heal_time = current_time
         
         self.logger.info(f"Healed for {heal_amount} HP")
@@ -248,33 +450,24 @@ class GameAI:
 
     def get_status_report(self) -> str:
         """Generate detailed status report"""
-        return f"""
-Game AI Status:
-Health: {self.health}/{self.max_health} HP
-Ammo: {self.ammo}/{self.max_ammo}
-Energy: {self.energy}/{self.max_energy}
-Position: {self.position}
-In Combat: {'Yes' if self.in_combat else 'No'}
-Current Target: {'Yes' if self.current_target else 'No'}
-Using Cover: {'Yes' if self.current_cover else 'No'}
-
-Statistics:
-Shots Fired: {self.stats['shots_fired']}
-Hits: {self.stats['hits']}
-Accuracy: {(self.stats['hits']/self.stats['shots_fired']*100 if self.stats['shots_fired'] > 0 else 0):.1f}%
-Damage Dealt: {self.stats['damage_dealt']:.1f}
-Distance Traveled: {self.stats['distance_traveled']:.1f}
-Items Collected: {self.stats['items_collected']}
-Active Time: {datetime.now() - self.stats['start_time']}
-"""
+        shots_fired = self.stats['shots_fired']
+        return _REPORT_TMPL.format_map(self.stats | {
+            'health': self.health,
+            'max_health': self.max_health,
+            'ammo': self.ammo,
+            'max_ammo': self.max_ammo,
+            'energy': self.energy,
+            'max_energy': self.max_energy,
+            'position': self.position,
+            'in_combat_yn': _YN[bool(self.in_combat)],
+            'target_yn': _YN[bool(self.current_target)],
+            'cover_yn': _YN[bool(self.current_cover)],
+            'accuracy': self.stats['hits'] / shots_fired * 100 if shots_fired > 0 else 0,
+            'active_time': timedelta(seconds=time.monotonic() - self.stats['start_time'])
+        })
 
-async def main():
-    # Initialize game AI and tree components
-    ai = GameAI()
-    manager = BehaviorTreeManager()
-    blackboard = Blackboard()
-    visualizer = TreeVisualizer()
-    
+def build_tree(ai: GameAI) -> BehaviorTreeManager:
+    """Build the behavior tree driving one GameAI"""
     # Create main selector
     main_selector = SelectorNode("main_selector")
     
@@ -293,16 +486,11 @@ async def main():
         policy=ParallelPolicy.REQUIRE_ALL
     )
     
-    # Scan sequence
-    scan = RetryNode(
-        "scan_retry",
-        properties={"max_attempts": 3}
-    )
-    scan_action = ActionNode(
+    # Scan (retries are handled inside scan_for_enemies)
+    scan = ActionNode(
         "scan_area",
         action_func=ai.scan_for_enemies
     )
-    scan.add_child(scan_action)
     
     # Find and move to cover
     cover_sequence = SequenceNode("cover_sequence")
@@ -312,9 +500,7 @@ async def main():
     )
     move_to_cover = ActionNode(
         "move_to_cover",
-        action_func=lambda: ai.move_to_position(
-            ai.current_cover.position if ai.current_cover else None
-        )
+        action_func=ai._move_to_current_cover
     )
     cover_sequence.add_child(find_cover)
     cover_sequence.add_child(move_to_cover)
@@ -326,16 +512,11 @@ async def main():
     # Create attack sequence
     attack_sequence = SequenceNode("attack_sequence")
     
-    # Attack with retries
-    attack = RetryNode(
-        "attack_retry",
-        properties={"max_attempts": 3}
-    )
-    attack_action = ActionNode(
+    # Attack; the cooldown allows one shot per tick, so no retry wrapper
+    attack = ActionNode(
         "attack",
         action_func=ai.attack_target
     )
-    attack.add_child(attack_action)
     
     # Add nodes to combat sequence
     combat_sequence.add_child(health_check)
@@ -362,38 +543,141 @@ async def main():
     main_selector.add_child(support_sequence)
     
     # Set up tree
+    manager = BehaviorTreeManager()
     manager.root = main_selector
-    main_selector.initialize(blackboard)
+    main_selector.initialize(Blackboard())
+    return manager
+
+class _DiffView:
+    """Curses window that only redraws rows whose text changed."""
+
+    def __init__(self, win):
+        self.win = win
+        self._last_shown = {}
+
+    def draw(self, lines):
+        height, width = self.win.getmaxyx()
+        lines = lines[:height]
+        for row, line in enumerate(lines):
+            if self._last_shown.get(row) != line:
+                self.win.addnstr(row, 0, line, width - 1)
+                self.win.clrtoeol()
+                self._last_shown[row] = line
+        for row in [r for r in self._last_shown if r >= len(lines)]:
+            self.win.move(row, 0)
+            self.win.clrtoeol()
+            del self._last_shown[row]
+        self.win.noutrefresh()
+
+async def _main(stdscr, num_agents, ais, managers):
+    # Initialize game AIs, each with its own tree; the lists belong to main()
+    # so it can still report once curses has restored the terminal
+    ais.extend(GameAI() for _ in range(num_agents))
+    managers.extend(build_tree(ai) for ai in ais)
+    visualizer = TreeVisualizer()
     
-    # Run game loop
+    # The first agent is the one shown on screen
+    ai, manager = ais[0], managers[0]
+    
+    # Status rows on top, tree window below; both are laid out once
     try:
-        print("\n=== Starting Game AI ===")
-        print(ai.get_status_report())
+        curses.curs_set(0)
+    except curses.error:
+        pass
+    rows, cols = stdscr.getmaxyx()
+    status_lines = ["=== Game AI Status ==="] + ai.get_status_report().splitlines()
+    status_height = min(len(status_lines) + 1, rows - 1)
+    status_view = _DiffView(curses.newwin(status_height, cols, 0, 0))
+    tree_view = _DiffView(curses.newwin(rows - status_height, cols, status_height, 0))
+    last_tree = None
+    
+    # The tree never changes shape, so build its ASCII layout once
+    tree_root = manager.root
+    template, slots = visualizer.compile_ascii_template(tree_root)
+    
+    def render():
+        nonlocal last_tree, tree_root, template, slots
+        status_view.draw(["=== Game AI Status ==="] + ai.get_status_report().splitlines())
+        if manager.root is not tree_root:
+            tree_root = manager.root
+            template, slots = visualizer.compile_ascii_template(tree_root)
+        # Only touch the tree window when a node status actually changed
+        tree_viz = visualizer.fill_ascii_template(template, slots)
+        if tree_viz != last_tree:
+            tree_view.draw(["=== Behavior Tree ==="] + tree_viz.splitlines())
+            last_tree = tree_viz
+        curses.doupdate()
+    
+    render()
+    
+    # Random per-agent offsets so the agents do not all tick on the same frame
+    offsets = [random.randint(0, agent.tick_every_n - 1) for agent in ais]
+    frame_count = 0
+    sim_clock = 0.0
+    while True:
+        # Tick every due agent concurrently; their actions mostly await sleeps
+        due = [
+            i for i, agent in enumerate(ais)
+            if (frame_count + offsets[i]) % agent.tick_every_n == 0 or agent._dirty
+        ]
+        if due:
+            now = sim_clock if USE_VIRTUAL_TIME else asyncio.get_running_loop().time()
+            for i in due:
+                ais[i]._dirty = False
+                ais[i]._now = now
+                ais[i]._sim_t = 0.0
+            results = await asyncio.gather(
+                *(managers[i].tick_tree() for i in due),
+                return_exceptions=True
+            )
+            for i, result in zip(due, results):
+                if isinstance(result, Exception):
+                    # One agent's failed tick shouldn't stop the others
+                    ais[i].logger.error(f"Agent {i} tick failed: {result!r}", exc_info=result)
+                elif isinstance(result, BaseException):
+                    # Cancellation, KeyboardInterrupt etc. still end the game
+                    raise result
+            # The frame lasts as long as the slowest agent's simulated actions
+            sim_clock += max(ais[i]._sim_t for i in due)
+            for i in due:
+                ais[i].tick_every_n = ais[i]._tick_interval()
         
-        frame_count = 0
-        while True:
-            # Update AI
-            status = await manager.tick_tree()
-            
-            # Update visualization every 10 frames
-            frame_count += 1
-            if frame_count % 10 == 0:
-                # Generate tree visualization
-                tree_viz = visualizer.create_ascii(manager.root)
-                
-                # Clear screen and show current status
-                print("\033[2J\033[H")  # Clear screen
-                print("=== Game AI Status ===")
-                print(ai.get_status_report())
-                print("\n=== Behavior Tree ===")
-                print(tree_viz)
-            
+        # Update visualization every 10 frames
+        frame_count += 1
+        if frame_count % 10 == 0:
+            render()
+        
+        if USE_VIRTUAL_TIME:
+            sim_clock += 0.1
+            await asyncio.sleep(0)
+        else:
             await asyncio.sleep(0.1)
-            
+
+def main(num_agents: int = 3):
+    ais, managers = [], []
+    
+    # Needed for curses to draw the tree's box-drawing characters
+    locale.setlocale(locale.LC_ALL, "")
+    try:
+        curses.wrapper(lambda stdscr: asyncio.run(_main(stdscr, num_agents, ais, managers)))
     except KeyboardInterrupt:
-        print("\n=== Game Over ===")
-        print(ai.get_status_report())
-        manager.stop()
+        if ais:
+            print("\n=== Game Over ===")
+            print(ais[0].get_status_report())
+        for agent_manager in managers:
+            agent_manager.stop()
+
+def run():
+    global USE_VIRTUAL_TIME
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, default=3, help="number of AI agents")
+    parser.add_argument("--fast", action="store_true",
+                        help="use virtual time instead of real sleeps")
+    args = parser.parse_args()
+    USE_VIRTUAL_TIME = args.fast
+    # Faster event loop when uvloop is installed (pip install .[fast])
+    install_uvloop()
+    main(args.agents)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
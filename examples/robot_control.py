@@ -1,13 +1,10 @@
+import argparse
 import asyncio
-import sys
 import logging
+import math
 from datetime import datetime
-from pathlib import Path
 import random
 
-# Add the project root to Python path
-sys.path.append(str(Path(__file__).parent.parent))
-
 from behavior_tree import (
     BehaviorTreeManager,
     SequenceNode,
@@ -19,9 +16,13 @@ from behavior_tree import (
     ParallelPolicy,
     Blackboard,
     RetryNode,
-    TimeoutNode
+    TimeoutNode,
+    install_uvloop
 )
 
+# Skip simulated delays and advance a virtual clock instead (--fast)
+USE_VIRTUAL_TIME = False
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -39,6 +40,14 @@ class RobotController:
         self.target_position = None
         self.logger = logging.getLogger("RobotController")
         
+        # Tick scheduling: the tree is ticked every tick_every_n frames, or on
+        # the next frame when _dirty is set by the battery crossing the check level
+        self.tick_every_n = 5
+        self._dirty = False
+        
+        # Simulated seconds spent in actions when running on virtual time
+        self.sim_time = 0.0
+        
         # Statistics
         self.stats = {
             'total_distance': 0.0,
@@ -47,6 +56,19 @@ class RobotController:
             'start_time': datetime.now()
         }
     
+    async def _wait(self, seconds: float):
+        """Simulated delay: a real sleep, or just virtual time with --fast"""
+        if USE_VIRTUAL_TIME:
+            self.sim_time += seconds
+        else:
+            await asyncio.sleep(seconds)
+    
+    def _set_battery(self, level: float):
+        """Update battery level, flagging a re-tick when it crosses 20%"""
+        if (self.battery <= 20) != (level <= 20):
+            self._dirty = True
+        self.battery = level
+    
     async def check_battery(self) -> bool:
         """Check if battery level is sufficient"""
         if self.battery <= 20:
@@ -63,7 +85,7 @@ class RobotController:
         # Calculate distance and energy
         dx = x - self.position[0]
         dy = y - self.position[1]
-        distance = (dx**2 + dy**2)**0.5
+        distance = math.hypot(dx, dy)
         energy_used = distance * 2
         
         if self.battery < energy_used:
@@ -72,23 +94,29 @@ class RobotController:
         
         # Simulate movement
         self.logger.info(f"Moving to ({x}, {y})")
-        await asyncio.sleep(distance * 0.1)
+        await self._wait(distance * 0.1)
         
         # Update position and battery
         self.position = (x, y)
-        self.battery = max(0, self.battery - energy_used)
+        self._set_battery(max(0, self.battery - energy_used))
         self.stats['total_distance'] += distance
         
         self.logger.info(f"Moved to ({x}, {y}), Battery: {self.battery:.1f}%")
         return True
     
+    async def _move_to_target(self) -> bool:
+        """Move to the target found by scan_area"""
+        if not self.target_position:
+            return False
+        return await self.move_to(*self.target_position)
+    
     async def scan_area(self) -> bool:
         """Scan area for targets"""
         self.logger.info("Scanning area...")
-        await asyncio.sleep(1.0)
+        await self._wait(1.0)
         
         # Use energy for scanning
-        self.battery = max(0, self.battery - 5)
+        self._set_battery(max(0, self.battery - 5))
         
         # Simulate target finding
         if random.random() < 0.8:  # 80% chance to find target
@@ -114,10 +142,10 @@ class RobotController:
             return False
         
         self.logger.info("Picking up object...")
-        await asyncio.sleep(0.5)
+        await self._wait(0.5)
         
         # Use energy for picking
-        self.battery = max(0, self.battery - 2)
+        self._set_battery(max(0, self.battery - 2))
         
         self.carrying_object = True
         self.stats['objects_picked'] += 1
@@ -140,9 +168,9 @@ class RobotController:
         charging_time = (100 - self.battery) * 0.05
         
         self.logger.info(f"Charging battery from {self.battery}%")
-        await asyncio.sleep(charging_time)
+        await self._wait(charging_time)
         
-        self.battery = 100
+        self._set_battery(100)
         self.stats['battery_charges'] += 1
         
         self.logger.info(f"Charging complete (+{100-initial_battery}%)")
@@ -210,10 +238,7 @@ async def main():
     # Create move nodes
     move_action = ActionNode(
         "move_to_target",
-        action_func=lambda: robot.move_to(
-            robot.target_position[0],
-            robot.target_position[1]
-        ) if robot.target_position else False
+        action_func=robot._move_to_target
     )
     
     move = TimeoutNode(
@@ -273,19 +298,36 @@ async def main():
         print("\n=== Starting Robot Control ===")
         print(robot.get_status_report())
         
+        # Random offset so several robots would not all tick on the same frame
+        frame_count = random.randint(0, robot.tick_every_n - 1)
         while True:
-            status = await manager.tick_tree()
-            if status.name in ['SUCCESS', 'FAILURE']:
-                await asyncio.sleep(0.1)
-                print("\n=== Current Status ===")
-                print(robot.get_status_report())
+            if frame_count % robot.tick_every_n == 0 or robot._dirty:
+                robot._dirty = False
+                status = await manager.tick_tree()
+                if status.name in ['SUCCESS', 'FAILURE']:
+                    await robot._wait(0.1)
+                    print("\n=== Current Status ===")
+                    print(robot.get_status_report())
             
-            await asyncio.sleep(0.1)
+            frame_count += 1
+            await robot._wait(0.1)
+            if USE_VIRTUAL_TIME:
+                await asyncio.sleep(0)
             
     except KeyboardInterrupt:
         print("\n=== Shutting Down ===")
         print(robot.get_status_report())
         manager.stop()
 
+def run():
+    global USE_VIRTUAL_TIME
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fast", action="store_true",
+                        help="use virtual time instead of real sleeps")
+    USE_VIRTUAL_TIME = parser.parse_args().fast
+    # Faster event loop when uvloop is installed (pip install .[fast])
+    install_uvloop()
+    asyncio.run(main())
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -4,9 +4,22 @@ setup(
     name="behavior-tree",
     version="0.1.0",
     packages=find_packages(),
+    python_requires=">=3.9",
     install_requires=[
-        "asyncio>=3.4.3",
         "pyyaml>=6.0",
+        # examples/game_ai_visualized.py (bt-game-ai) needs numpy
+        "numpy",
     ],
+    extras_require={
+        "dev": ["pytest"],
+        "examples": ["scipy", "numba"],
+        "fast": ["msgspec>=0.18", "orjson>=3.6", "uvloop; sys_platform != 'win32'"],
+    },
+    entry_points={
+        "console_scripts": [
+            "bt-robot = examples.robot_control:run",
+            "bt-game-ai = examples.game_ai_visualized:run",
+        ],
+    },
 )
 
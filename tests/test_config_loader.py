@@ -0,0 +1,255 @@
+import dataclasses
+import json
+
+import pytest
+import yaml
+
+from behavior_tree.utils import config_loader
+from behavior_tree.utils.config_loader import ConfigLoader, ConfigValidationError
+
+TREE = {
+    "name": "root",
+    "type": "SequenceNode",
+    "properties": {"timeout": 5},
+    "children": [
+        {"name": "a", "type": "ActionNode", "properties": {"retries": 2, "tags": ["x"]}},
+        {"name": "b", "type": "ActionNode", "properties": {"retries": 2, "tags": ["x"]}},
+        {
+            "name": "sel",
+            "type": "SelectorNode",
+            "children": [
+                {"name": "c", "type": "ActionNode", "properties": {"retries": 2, "tags": ["x"]}},
+            ],
+        },
+    ],
+}
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    if path.suffix == ".json":
+        path.write_text(json.dumps(data), encoding="utf-8")
+    else:
+        path.write_text(yaml.safe_dump(data), encoding="utf-8")
+    return path
+
+
+def _load(path, monkeypatch, use_msgspec):
+    if not use_msgspec:
+        monkeypatch.setattr(config_loader, "msgspec", None)
+    return ConfigLoader().load_file(path)
+
+
+@pytest.fixture(params=[".json", ".yaml"])
+def suffix(request):
+    return request.param
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_load_file_interns_properties(tmp_path, monkeypatch, suffix, use_msgspec):
+    if use_msgspec and config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    config = _load(_write(tmp_path, "tree" + suffix, TREE), monkeypatch, use_msgspec)
+
+    a, b, sel = config.children
+    assert a.properties is b.properties
+    assert sel.children[0].properties is a.properties
+    assert sel.properties is None
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_interned_properties_survive_edit_and_yaml_round_trip(
+    tmp_path, monkeypatch, suffix, use_msgspec
+):
+    if use_msgspec and config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    config = _load(_write(tmp_path, "tree" + suffix, TREE), monkeypatch, use_msgspec)
+    a, b, sel = config.children
+
+    # shared properties cannot be edited in place ...
+    with pytest.raises(TypeError):
+        a.properties["retries"] = 9
+    with pytest.raises(TypeError):
+        a.properties.update(retries=9)
+    # ... so an edit replaces the dict of that one node
+    a.properties = {**a.properties, "retries": 9}
+    assert b.properties["retries"] == sel.children[0].properties["retries"] == 2
+
+    saved = tmp_path / "saved.yaml"
+    ConfigLoader().save_config(config, saved)
+    text = saved.read_text(encoding="utf-8")
+    assert "&id" not in text and "*id" not in text
+
+    reloaded = _load(saved, monkeypatch, use_msgspec)
+    assert [child.properties for child in reloaded.children[:2]] == [
+        {"retries": 9, "tags": ["x"]},
+        {"retries": 2, "tags": ["x"]},
+    ]
+    assert reloaded.children[2].children[0].properties == {"retries": 2, "tags": ["x"]}
+
+
+def test_load_file_same_result_with_and_without_msgspec(tmp_path, monkeypatch, suffix):
+    if config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    path = _write(tmp_path, "tree" + suffix, TREE)
+
+    fast = _load(path, monkeypatch, use_msgspec=True)
+    slow = _load(path, monkeypatch, use_msgspec=False)
+
+    assert fast == slow
+    assert fast.to_dict() == slow.to_dict() == TREE
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_load_file_returns_dataclass(tmp_path, monkeypatch, suffix, use_msgspec):
+    if use_msgspec and config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    config = _load(_write(tmp_path, "tree" + suffix, TREE), monkeypatch, use_msgspec)
+
+    assert type(config) is config_loader.NodeConfig
+    assert dataclasses.is_dataclass(config)
+    assert dataclasses.replace(config, name="renamed").name == "renamed"
+    assert dataclasses.asdict(config)["children"][2]["children"][0]["name"] == "c"
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+@pytest.mark.parametrize("field", ["properties", "children"])
+def test_load_file_rejects_null(tmp_path, monkeypatch, suffix, use_msgspec, field):
+    if use_msgspec and config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    path = _write(tmp_path, "tree" + suffix, {"name": "root", "type": "SequenceNode", field: None})
+
+    with pytest.raises(ConfigValidationError):
+        _load(path, monkeypatch, use_msgspec)
+
+
+def _tree_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        tree = dict(TREE, name=f"root{i}")
+        paths.append(_write(tmp_path, f"tree{i}" + (".json" if i % 2 else ".yaml"), tree))
+    return paths
+
+
+def test_load_many_uses_process_pool(tmp_path, monkeypatch):
+    used = []
+
+    class RecordingPool(config_loader.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            used.append(True)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(config_loader, "ProcessPoolExecutor", RecordingPool)
+    paths = _tree_files(tmp_path, 4)
+    loader = ConfigLoader()
+
+    configs = loader.load_many(paths, max_workers=2)
+
+    assert used
+    assert configs == [loader.load_file(path) for path in paths]
+    assert [config.name for config in configs] == ["root0", "root1", "root2", "root3"]
+
+
+def test_load_many_falls_back_to_threads_for_unpicklable_validators(tmp_path):
+    seen = []
+    # a lambda cannot be pickled, so the files are parsed on threads in this process
+    loader = ConfigLoader({"SequenceNode": lambda props: seen.append(props)})
+    paths = _tree_files(tmp_path, 3)
+
+    configs = loader.load_many(paths)
+
+    assert [config.name for config in configs] == ["root0", "root1", "root2"]
+    assert len(seen) == 3
+
+
+class CustomTypesLoader(ConfigLoader):
+    """Loader subclass that accepts an extra node type"""
+
+    def __init__(self, extra_type, custom_validators=None):
+        self.extra_type = extra_type
+        super().__init__(custom_validators)
+
+    def _collect_node_types(self):
+        return {**super()._collect_node_types(), self.extra_type: object}
+
+
+def _custom_tree_files(tmp_path, count):
+    return [
+        _write(tmp_path, f"custom{i}.json", {"name": f"root{i}", "type": "PatrolNode"})
+        for i in range(count)
+    ]
+
+
+def test_load_many_workers_use_loader_subclass(tmp_path, monkeypatch):
+    used = []
+
+    class RecordingPool(config_loader.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            used.append(True)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(config_loader, "ProcessPoolExecutor", RecordingPool)
+    paths = _custom_tree_files(tmp_path, 3)
+
+    configs = CustomTypesLoader("PatrolNode").load_many(paths, max_workers=2)
+
+    assert used
+    assert [config.type for config in configs] == ["PatrolNode"] * 3
+    with pytest.raises(ConfigValidationError):
+        ConfigLoader().load_many(paths, max_workers=2)
+
+
+def test_load_many_falls_back_to_threads_for_unpicklable_loader(tmp_path, monkeypatch):
+    class LocalLoader(CustomTypesLoader):
+        pass
+
+    monkeypatch.setattr(config_loader, "ProcessPoolExecutor", pytest.fail)
+    paths = _custom_tree_files(tmp_path, 3)
+
+    configs = LocalLoader("PatrolNode").load_many(paths)
+
+    assert [config.name for config in configs] == ["root0", "root1", "root2"]
+
+
+@pytest.mark.parametrize("validators", [None, {"SequenceNode": lambda props: None}])
+def test_load_many_reports_invalid_files(tmp_path, validators):
+    paths = _tree_files(tmp_path, 2)
+    paths.append(_write(tmp_path, "bad.json", {"name": "bad", "type": "NoSuchNode"}))
+
+    with pytest.raises(ConfigValidationError):
+        ConfigLoader(validators).load_many(paths)
+
+
+UNCHECKED_TREE = {
+    "name": "root",
+    "type": "NoSuchNode",
+    "properties": {"parallel_policy": "not-a-policy"},
+    "children": [{"name": "leaf", "type": "ActionNode"}],
+}
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_trusted_load_skips_validation(tmp_path, monkeypatch, suffix, use_msgspec):
+    if use_msgspec and config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    if not use_msgspec:
+        monkeypatch.setattr(config_loader, "msgspec", None)
+    path = _write(tmp_path, "tree" + suffix, UNCHECKED_TREE)
+
+    config = ConfigLoader().load_file(path, trusted=True)
+
+    assert config.to_dict() == UNCHECKED_TREE
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+@pytest.mark.parametrize("tree", [
+    UNCHECKED_TREE,
+    dict(UNCHECKED_TREE, type="ParallelNode"),
+])
+def test_untrusted_load_rejects_invalid_config(tmp_path, monkeypatch, suffix, use_msgspec, tree):
+    if use_msgspec and config_loader.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    path = _write(tmp_path, "tree" + suffix, tree)
+
+    with pytest.raises(ConfigValidationError):
+        _load(path, monkeypatch, use_msgspec)
@@ -0,0 +1,66 @@
+import asyncio
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+game = pytest.importorskip("examples.game_ai_visualized")
+
+BACKENDS = ["kdtree", "numba", "numpy"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(game, "USE_VIRTUAL_TIME", True)
+    if request.param == "kdtree":
+        if game.cKDTree is None:
+            pytest.skip("scipy is not installed")
+        monkeypatch.setattr(game, "_KDTREE_MIN_POINTS", 0)
+    else:
+        monkeypatch.setattr(game, "_KDTREE_MIN_POINTS", math.inf)
+        if request.param == "numba":
+            if game.njit is None:
+                pytest.skip("numba is not installed")
+        else:
+            monkeypatch.setattr(game, "_nearest_kernel", None)
+            monkeypatch.setattr(game, "_best_cover_kernel", None)
+    return request.param
+
+
+def _make_ai(seed):
+    ai = game.GameAI()
+    ai.cover_candidates = len(ai.covers)
+    ai.position = tuple(np.random.default_rng(seed).uniform(-20, 20, 2))
+    return ai
+
+
+def _dist(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_scan_matches_reference(backend, seed):
+    ai = _make_ai(seed)
+    found = asyncio.run(ai.scan_for_enemies(max_attempts=1))
+
+    distances = [_dist(ai.position, e.position) for e in ai.enemies]
+    # positions are stored as float32 and the numba kernel uses fastmath
+    assert ai._nearest_enemy_dist == pytest.approx(min(distances), rel=1e-5)
+    assert found == (min(distances) < ai.detection_range)
+    if found:
+        assert ai.current_target is ai.enemies[int(np.argmin(distances))]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_cover_matches_reference(backend, seed):
+    ai = _make_ai(seed)
+    ai.current_target = ai.enemies[0]
+    assert asyncio.run(ai.find_cover())
+
+    target = ai.current_target.position
+    scores = [
+        _dist(ai.position, c.position)
+        - _dist(c.position, target) * c.properties['protection']
+        for c in ai.covers
+    ]
+    assert ai.current_cover is ai.covers[int(np.argmin(scores))]
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import time
+import types
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from behavior_tree import (
+    ActionNode, NodeStatus, SelectorNode, SequenceNode, TreeVisualizer, install_uvloop
+)
+from behavior_tree.utils import visualization
+
+
+class FakeClient:
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.received = []
+
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.received.append(message)
+
+
+def test_send_to_clients_shares_one_deadline():
+    visualizer = TreeVisualizer()
+    visualizer._send_timeout = 0.2
+    fast = [FakeClient() for _ in range(3)]
+    stalled = [FakeClient(delay=10), FakeClient(delay=10)]
+    broken = FakeClient(error=ConnectionError("closed"))
+    clients = [stalled[0], *fast, broken, stalled[1]]
+
+    start = time.monotonic()
+    failed = asyncio.run(visualizer._send_to_clients(b"frame", clients))
+    elapsed = time.monotonic() - start
+
+    # stalled clients do not add their timeouts up, nor delay the others
+    assert elapsed < 0.4
+    assert set(failed) == {*stalled, broken}
+    assert all(client.received == [b"frame"] for client in fast)
+
+
+def test_send_to_clients_without_clients():
+    assert asyncio.run(TreeVisualizer()._send_to_clients(b"frame", [])) == []
+
+
+def _history_visualizer(frames=2):
+    root = SequenceNode("root")
+    root.add_child(ActionNode("a", action_func=lambda: True))
+    visualizer = TreeVisualizer()
+    for _ in range(frames):
+        visualizer.history.append({'tree_data': visualizer._create_snapshot(root)})
+    return visualizer
+
+
+def test_save_animation_logs_frame_render_errors(tmp_path, monkeypatch, caplog):
+    pytest.importorskip("graphviz")
+    pytest.importorskip("imageio")
+    # no dot on PATH: the workers raise graphviz.ExecutableNotFound
+    monkeypatch.setenv("PATH", str(tmp_path))
+    visualizer = _history_visualizer()
+    output = tmp_path / "anim.gif"
+
+    with caplog.at_level(logging.ERROR, logger="TreeVisualizer"):
+        visualizer.save_animation(str(output))
+
+    assert "Error rendering animation frames" in caplog.text
+    assert not output.exists()
+
+
+def test_render_frames_falls_back_to_serial(monkeypatch, caplog):
+    class BrokenPool:
+        def __init__(self, *args, **kwargs):
+            raise BrokenProcessPool("no workers")
+
+    rendered = []
+
+    def fake_render(frame_path, graph_data, style_tuple, default_style):
+        rendered.append(frame_path)
+        return f"{frame_path}.png"
+
+    monkeypatch.setattr(visualization, "ProcessPoolExecutor", BrokenPool)
+    monkeypatch.setattr(visualization, "_render_frame", fake_render)
+    visualizer = _history_visualizer()
+    graph_data = [snapshot['tree_data'] for snapshot in visualizer.history]
+
+    with caplog.at_level(logging.WARNING, logger="TreeVisualizer"):
+        paths = visualizer._render_frames(["f0", "f1"], graph_data)
+
+    assert paths == ["f0.png", "f1.png"]
+    assert rendered == ["f0", "f1"]
+    assert "rendering frames serially" in caplog.text
+
+
+def _fake_manager(root):
+    return types.SimpleNamespace(root=root, get_stats=lambda: {})
+
+
+async def _monitor(visualizer, manager, action):
+    visualizer.update_interval = 0.01
+    await visualizer.start_monitoring(manager)
+    try:
+        await asyncio.sleep(0.05)
+        action()
+        await asyncio.sleep(0.05)
+    finally:
+        await visualizer.stop_monitoring()
+
+
+def test_monitoring_works_across_event_loops():
+    root = _sample_tree()
+    visualizer = TreeVisualizer()
+    manager = _fake_manager(root)
+
+    # the dirty event belongs to the loop of each start_monitoring call
+    for status in (NodeStatus.SUCCESS, NodeStatus.FAILURE):
+        for node in _walk(root):
+            node.status = status
+        asyncio.run(_monitor(visualizer, manager, root.reset))
+        assert set(visualizer.history[-1]['tree_data']['statuses']) == {"INVALID"}
+
+
+def test_monitoring_watches_nodes_added_later():
+    root = _sample_tree()
+    visualizer = TreeVisualizer()
+    late = ActionNode("late", action_func=lambda: True)
+
+    def attach_and_update():
+        root.add_child(late)
+        # the new node was not part of the tree when monitoring started
+        late.status = NodeStatus.RUNNING
+        late.reset()
+
+    asyncio.run(_monitor(visualizer, _fake_manager(root), attach_and_update))
+
+    tree_data = visualizer.history[-1]['tree_data']
+    assert tree_data['statuses'][tree_data['names'].index("late")] == "INVALID"
+
+
+def test_watched_nodes_follow_tree_changes():
+    root = _sample_tree()
+    visualizer = TreeVisualizer()
+    late = ActionNode("late", action_func=lambda: True)
+    seen = []
+
+    async def scenario():
+        visualizer.update_interval = 0.01
+        await visualizer.start_monitoring(_fake_manager(root))
+        root.add_child(late)
+        await asyncio.sleep(0.05)
+        seen.append(late in visualizer._watched_nodes)
+        root.remove_child(late)
+        await asyncio.sleep(0.05)
+        seen.append(late in visualizer._watched_nodes)
+        await visualizer.stop_monitoring()
+
+    asyncio.run(scenario())
+
+    assert seen == [True, False]
+    assert not late.event_handlers[visualization.NodeEvent.STATUS_CHANGED]
+
+
+def test_snapshot_copies_mutable_node_data():
+    root = _sample_tree()
+    leaf = root.children[1]
+    leaf.properties["speed"] = 1
+    leaf.stats = {"ticks": 1}
+    visualizer = TreeVisualizer()
+
+    tree_data = visualizer._create_snapshot(root)
+    # the node keeps changing on the loop while the worker diffs the snapshot
+    leaf.properties["speed"] = 2
+    leaf.stats["ticks"] = 2
+    changes, _ = visualizer._diff_snapshot(tree_data)
+
+    record = next(change for change in changes if change.name == "c")
+    assert record.properties == {"speed": 1}
+    assert record.metadata['stats'] == {"ticks": 1}
+
+
+def test_delta_encoding_is_the_same_with_and_without_orjson(monkeypatch):
+    root = _sample_tree()
+    visualizer = TreeVisualizer()
+    changes, _ = visualizer._diff_snapshot(visualizer._create_snapshot(root))
+    message = {'type': 'delta', 'changes': changes, 'removed': []}
+
+    fast = json.loads(visualization._encode(message))
+    monkeypatch.setattr(visualization, "orjson", None)
+    slow = json.loads(visualization._encode(message))
+
+    assert fast == slow
+    seq = fast['changes'][1]
+    assert seq['name'] == "seq" and seq['parent_id'] == fast['changes'][0]['id']
+    assert seq['children'] == [change['id'] for change in fast['changes'][2:4]]
+    assert seq['metadata'] == {'path': "root/seq", 'stats': {}}
+
+
+def test_reset_emits_status_changed():
+    root = _sample_tree()
+    events = []
+    for node in _walk(root):
+        node.add_event_handler(
+            visualization.NodeEvent.STATUS_CHANGED,
+            lambda node, event: events.append(node.name)
+        )
+        node.status = NodeStatus.SUCCESS
+
+    root.reset()
+    assert sorted(events) == ["a", "b", "c", "root", "seq"]
+
+    # nodes that are already INVALID do not report a change
+    events.clear()
+    root.reset()
+    assert events == []
+
+
+def test_vis_edges_are_keyed_by_child_id():
+    root = _sample_tree()
+    visualizer = TreeVisualizer()
+    nodes, edges = visualizer._build_vis_data(root)
+
+    # the browser replaces a node's parent edge by id when a delta arrives
+    assert [edge['id'] for edge in edges] == [edge['to'] for edge in edges]
+    assert {node['id'] for node in nodes[1:]} == {edge['id'] for edge in edges}
+    html = visualizer.create_html(root)
+    for status, (_, color) in visualizer._style_tuple.items():
+        assert f'"{status.name}":"{color}"' in html.replace(" ", "")
+
+
+def _reference_ascii(node, prefix="", is_last=True):
+    """Straightforward recursive renderer, the layout create_ascii has always produced"""
+    line = f"{prefix}{'└── ' if is_last else '├── '}{node.name} ({node.status.name})"
+    lines = [line]
+    children = getattr(node, "children", [])
+    for i, child in enumerate(children):
+        lines.append(_reference_ascii(
+            child, prefix + ("    " if is_last else "│   "), i == len(children) - 1
+        ))
+    return "\n".join(lines)
+
+
+def _sample_tree():
+    root = SelectorNode("root")
+    seq = SequenceNode("seq")
+    seq.add_child(ActionNode("a", action_func=lambda: True))
+    seq.add_child(ActionNode("b", action_func=lambda: True))
+    root.add_child(seq)
+    root.add_child(ActionNode("c", action_func=lambda: True))
+    return root
+
+
+def _walk(node):
+    yield node
+    for child in getattr(node, "children", []):
+        yield from _walk(child)
+
+
+def test_ascii_template_matches_create_ascii():
+    visualizer = TreeVisualizer()
+    root = _sample_tree()
+    template, slots = visualizer.compile_ascii_template(root)
+
+    statuses = list(NodeStatus)
+    for step in range(len(statuses) + 1):
+        for i, node in enumerate(_walk(root)):
+            node.status = statuses[(i + step) % len(statuses)]
+        text = visualizer.fill_ascii_template(template, slots)
+        assert text.encode() == visualizer.create_ascii(root).encode()
+        assert text == _reference_ascii(root)
+
+
+def test_ascii_template_has_one_slot_per_node():
+    root = _sample_tree()
+    _, slots = TreeVisualizer().compile_ascii_template(root)
+
+    assert [node for _, node in slots] == list(_walk(root))
+
+
+def test_install_uvloop_is_noop_without_uvloop(monkeypatch):
+    # a None entry makes "import uvloop" raise ImportError
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    monkeypatch.setattr(visualization, "_uvloop_installed", False)
+    monkeypatch.setattr(visualization.sys, "platform", "linux")
+    policy = asyncio.get_event_loop_policy()
+
+    assert install_uvloop() is False
+    assert asyncio.get_event_loop_policy() is policy
+    assert visualization._uvloop_installed is False
+
+
+def test_install_uvloop_installs_once(monkeypatch):
+    calls = []
+    fake_uvloop = types.SimpleNamespace(install=lambda: calls.append(True))
+    monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+    monkeypatch.setattr(visualization, "_uvloop_installed", False)
+    monkeypatch.setattr(visualization.sys, "platform", "linux")
+
+    assert install_uvloop() is True
+    assert install_uvloop() is True
+    assert calls == [True]
+
+
+def test_install_uvloop_skipped_on_windows(monkeypatch):
+    fake_uvloop = types.SimpleNamespace(install=pytest.fail)
+    monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+    monkeypatch.setattr(visualization, "_uvloop_installed", False)
+    monkeypatch.setattr(visualization.sys, "platform", "win32")
+
+    assert install_uvloop() is False
+
+
+def test_importing_visualization_does_not_import_uvloop():
+    code = (
+        "import sys, behavior_tree.utils.visualization; "
+        "sys.exit('uvloop' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0